@@ -1,3 +1,10 @@
+import os
+import sys
+import json
+import typing
+import argparse
+import contextlib
+
 import consoleiotools as cit
 import consolecmdtools as cct
 
@@ -53,6 +60,167 @@ def examples():
     cit.print(inspect("is_admin"))
 
 
+def _read_inputs(inputs: list) -> typing.Iterator[str]:
+    """Get the inputs from the args, or one per line from stdin if there is no args or the arg is "-"."""
+    if inputs and inputs != ["-"]:
+        return iter(inputs)
+    return (line.rstrip("\r\n") for line in sys.stdin if line.strip())
+
+
+def _read_pairs(inputs: list) -> typing.Iterator[tuple[str, str]]:
+    """Get the pairs from the args as `a1 b1 a2 b2 ...`, or one tab-separated pair per line from stdin."""
+    if inputs and inputs != ["-"]:
+        if len(inputs) % 2:
+            raise SystemExit("diff: expect pairs of paths, got an odd number of args")
+        return iter(zip(inputs[::2], inputs[1::2]))
+    return (tuple(line.split("\t", 1)) for line in _read_inputs([]))
+
+
+def _imap(func: typing.Callable, inputs: typing.Iterable, workers: int | None = 1) -> typing.Iterator[tuple]:
+    """Call `func(input)` for each input, and yield `(input, result, error)` as they complete.
+
+    With `workers` > 1, the calls run on a thread pool with a bounded number of inputs in flight, so stdin is read as the results are written, and the order is not kept.
+    """
+    if not workers or workers <= 1:
+        for item in inputs:
+            try:
+                yield item, func(item), None
+            except Exception as e:
+                yield item, None, e
+        return
+    import concurrent.futures
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as executor:
+        pending = {}
+        for item in inputs:
+            pending[executor.submit(func, item)] = item
+            if len(pending) < workers * 4:
+                continue
+            done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                yield pending.pop(future), *_outcome(future)
+        for future in concurrent.futures.as_completed(pending):
+            yield pending[future], *_outcome(future)
+
+
+def _outcome(future) -> tuple:
+    error = future.exception()
+    return (None, error) if error else (future.result(), None)
+
+
+def _error_text(error: BaseException) -> str:
+    return f"{type(error).__name__}: {error}"
+
+
+def _hash(args) -> typing.Iterator[dict]:
+    def run(target: str) -> dict:
+        if not args.text and not os.path.isfile(target):
+            raise FileNotFoundError(f"not a file: {target}")
+        return {algo: getattr(cct, algo)(target, force_text=args.text) for algo in args.algo.split(",")}
+
+    for target, result, error in _imap(run, _read_inputs(args.inputs), args.workers):
+        yield dict({"input": target}, **(result or {"error": _error_text(error)}))
+
+
+def _tree(args) -> typing.Iterator[dict]:
+    def run(root: str) -> dict:
+        stats = cct.tree_stats(root, top=args.top)
+        if not args.dirs:
+            del stats["dir_sizes"]
+        return stats
+
+    for root, result, error in _imap(run, _read_inputs(args.inputs), args.workers):
+        yield dict({"input": root}, **(result or {"error": _error_text(error)}))
+
+
+def _diff(args) -> typing.Iterator[dict]:
+    def run(pair: tuple) -> dict:
+        if len(pair) != 2:
+            raise ValueError("expect a tab-separated pair of paths")
+        for path in pair:
+            if not os.path.isfile(path):
+                raise FileNotFoundError(f"not a file: {path}")
+        lines = cct.diff(*pair, context=args.context)
+        return {"same": not lines, "diff": lines}
+
+    for pair, result, error in _imap(run, _read_pairs(args.inputs), args.workers):
+        yield dict({"a": pair[0], "b": pair[-1]}, **(result or {"error": _error_text(error)}))
+
+
+def _color(args) -> typing.Iterator[dict]:
+    def run(source: str) -> dict:
+        return {"color": cct.main_color(source, triplet=args.triplet, is_url="://" in source)}
+
+    for source, result, error in _imap(run, _read_inputs(args.inputs), args.workers):
+        yield dict({"input": source}, **(result or {"error": _error_text(error)}))
+
+
+def _fetch(args) -> typing.Iterator[dict]:
+    import hashlib
+
+    for result in cct.fetch_many(_read_inputs(args.inputs), concurrency=args.workers or 8):
+        if result["error"]:
+            yield {"input": result["url"], "error": _error_text(result["error"])}
+            continue
+        content = result["content"]
+        record = {"input": result["url"], "bytes": len(content), "md5": hashlib.md5(content).hexdigest()}  # `cct.md5()` takes a body naming a local file as the path
+        if args.text:
+            record["text"] = content.decode("utf-8", errors="replace")
+        yield record
+
+
+def _make_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="python -m consolecmdtools", description="Show the features of consolecmdtools, or run a command over many inputs in one process.")
+    parser.add_argument("--profile", action="store_true", help="print the call counts, latencies and bytes processed of the helpers, to stderr for the commands")
+    inputs = argparse.ArgumentParser(add_help=False)
+    inputs.add_argument("inputs", nargs="*", help="the inputs, or one per line from stdin if omitted or '-'")
+    inputs.add_argument("-j", "--workers", type=int, help="run on N threads, the records are written as they complete. Defaults to 1, 8 for fetch")
+    commands = parser.add_subparsers(dest="command", metavar="COMMAND", description="Each command writes one json record per input to stdout (NDJSON).")
+    command = commands.add_parser("hash", parents=[inputs], help="hash files")
+    command.add_argument("--algo", default="md5", help="md5, crc32 or both as 'md5,crc32'. Defaults to md5")
+    command.add_argument("--text", action="store_true", help="hash the inputs as text instead of file paths")
+    command.set_defaults(func=_hash)
+    command = commands.add_parser("tree", parents=[inputs], help="get the disk usage of folders")
+    command.add_argument("--top", type=int, default=10, help="how many largest files to keep. Defaults to 10")
+    command.add_argument("--dirs", action="store_true", help="include the size of every sub-folder")
+    command.set_defaults(func=_tree)
+    command = commands.add_parser("diff", parents=[inputs], help="diff pairs of files, as 'a1 b1 a2 b2 ...' args or 'a<TAB>b' lines")
+    command.add_argument("--context", type=int, default=0, help="context lines around the diffs. Defaults to 0")
+    command.set_defaults(func=_diff)
+    command = commands.add_parser("color", parents=[inputs], help="get the main color of images, files or urls")
+    command.add_argument("--triplet", default="hex", choices=("hex", "rgb"), help="the color format. Defaults to hex")
+    command.set_defaults(func=_color)
+    command = commands.add_parser("fetch", parents=[inputs], help="fetch urls, report their sizes and md5")
+    command.add_argument("--text", action="store_true", help="include the content decoded as utf-8")
+    command.set_defaults(func=_fetch)
+    return parser
+
+
+def main(argv: list | None = None) -> int:
+    args = _make_parser().parse_args(argv)
+    if args.profile:
+        cct.metrics.enable()
+    if not args.command:
+        cit.panel(f"cct.__version__ = {cct.__version__}", title="ConsoleCMDTools Features")
+        try:
+            examples()
+        finally:
+            if args.profile:
+                cct.metrics.print_table()
+        return 0
+    exit_code = 0
+    out = sys.stdout
+    with contextlib.redirect_stdout(sys.stderr):  # keep the logs of the helpers out of the records
+        try:
+            for record in args.func(args):
+                exit_code = 1 if "error" in record else exit_code
+                out.write(json.dumps(record, ensure_ascii=False) + "\n")
+                out.flush()
+        finally:
+            if args.profile:
+                cct.metrics.print_table()
+    return exit_code
+
+
 if __name__ == "__main__":
-    cit.panel(f"cct.__version__ = {cct.__version__}", title="ConsoleCMDTools Features")
-    examples()
+    sys.exit(main())
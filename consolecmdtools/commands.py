@@ -0,0 +1,224 @@
+import os
+import sys
+import platform
+import shutil
+# !! some imports are lazy-loaded
+
+import consoleiotools as cit
+
+
+def banner(text: str) -> str:
+    """Generate a banner of 3 lines"""
+    FILLER = "#"
+    text = text.strip()
+    middle_line = FILLER + text.center(int(len(text) / 0.618)) + FILLER
+    top_line = bottom_line = FILLER * len(middle_line)
+    return "\n".join([top_line, middle_line, bottom_line])
+
+
+def clear_screen():
+    """Clear the console screen"""
+    if platform.system() == "Windows":  # Windows
+        os.system("cls")
+    elif platform.system() == "Linux":  # Linux
+        os.system("clear")
+    elif platform.system() == "Darwin":  # macOS
+        os.system("clear")
+    else:  # Other OS
+        os.system("clear")
+
+
+def get_py_cmd() -> str:
+    """Get OS's python command"""
+    for cmd in ("py", "python3", "python"):
+        if is_cmd_exist(cmd):
+            return cmd
+    return sys.executable
+
+
+def run_cmd(cmd: str) -> bool:
+    """Run command and show if success or failed
+
+    Args:
+        cmd (str): The command.
+    Returns:
+        bool: Does this command run successfully
+    """
+    SUCCESS_CODE = 0
+    cit.echo(cmd, pre="command")
+    is_success = (os.system(cmd) == SUCCESS_CODE)
+    if not is_success:
+        cit.warn("Command Failed")
+    return is_success
+
+
+def read_cmd(cmd: str, verbose: bool = True) -> str:
+    """Run command and return command's output
+
+    Args:
+        cmd (str): The command.
+    Returns:
+        str: What the command's output to stdout
+    """
+    import subprocess
+
+    if verbose:
+        cit.echo(cmd, pre="_command")
+    proc = subprocess.Popen(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, shell=True, text=True)  # text=True for str output, shell=True for run cmd directly in shell instead of run cmd.exe
+    (proc_stdout, proc_stderr) = proc.communicate(input=None)  # proc_stdin
+    if proc.returncode and proc_stderr and verbose:
+        cit.warn("Command Failed:")
+        cit.print(proc_stderr)
+    return proc_stdout  # or proc.returncode
+
+
+def is_cmd_exist(cmd: str) -> bool:
+    """Test if command is available for execution.
+
+    Args:
+        cmd (str): The command.
+
+    Returns:
+        bool: if the command is exist
+    """
+    base_cmd = cmd.split()[0].strip()
+    if shutil.which(base_cmd) is not None:  # Command is a executable under PATH
+        return True
+    if platform.system() == "Windows":  # Windows
+        result = os.system(f"where {base_cmd} >nul 2>&1")
+        return (result == 0)
+    else:  # Linux, Unix, macOS
+        proc = os.popen(f"command -v '{base_cmd}'")  # only bash functions support
+        result = proc.read()
+        proc.close()
+        return (result != "")
+
+
+def resolve_value(data):
+    """Get the value for the current platform from the given input.
+
+    Args:
+        data (Any | dict): The data or a dict for datas for different platforms. The dict key is `platform.system()`, and `*` is for default. E.g. {"Windows": ..., "Darwin": ..., "*": Defaults}
+
+    Returns:
+        Any: The value for the current platform.
+    """
+    if isinstance(data, dict):
+        result = data.get(platform.system()) or data.get(platform.system().lower()) or data.get(platform.system().upper()) or data.get(platform.system().capitalize())
+        if result is None:  # no value for the current platform
+            result = data.get('*')  # use the default value
+        return result  # return the value even if it's None
+    return data  # return the data if it's not a dict
+
+
+def install_package(name: str | dict, manager: str | dict = {"Windows": "scoop", "Linux": "apt", "Darwin": "brew", "*": "pip3"}) -> bool:
+    """Install package using package manager
+
+    Args:
+        package (str|dict): The package name or a dict of package names for different platforms. If this is a dict, the key should be the platform name from `platform.system()` or `*` for default, and the value should be the package name.
+        manager (str|dict): The package manager or a dict of package managers for different platforms. If is a dict, the key should be the platform name from `platform.system()` or `*` for default, and the value should be the package manager name. Defaults to `{"Windows": "scoop", "Linux": "apt", "Darwin": "brew", "*": "pip3"}`.
+
+    Returns:
+        bool: Does this command run successfully
+    """
+    # check inputs
+    if not name:
+        cit.err("No package name provided!")
+        return False
+    cit.info(f"Platform: {platform.system()}")
+    manager_name = resolve_value(manager)
+    cit.info(f"Package Manager: {manager_name}")
+    package_name = resolve_value(name)
+    cit.info(f"Package Name: {package_name}")
+    # Install package
+    available_managers = {
+        "scoop": {  # Scoop (Windows)
+            "command": "scoop",
+            "commandline": "scoop install {}",
+        },
+        "choco": {  # Chocolatey (Windows)
+            "command": "choco",
+            "commandline": "choco install {}",
+        },
+        "brew": {  # Homebrew (macOS)
+            "command": "brew",
+            "commandline": "brew install {}",
+        },
+        "port": {  # MacPorts (macOS)
+            "command": "port",
+            "commandline": "sudo port install {}",
+        },
+        "apt": {  # APT (Debian/Ubuntu)
+            "command": "apt",
+            "commandline": "sudo apt install {}",
+        },
+        "snap": {  # Snap (Ubuntu)
+            "command": "snap",
+            "commandline": "sudo snap install {}",
+        },
+        "pip": {  # pip (Python)
+            "command": "pip",
+            "commandline": "pip install --user {}",
+        },
+        "pip3": {  # pip3 (Python3)
+            "command": "pip3",
+            "commandline": "pip3 install --user {}",
+        },
+        "pipx": {  # pipx (Python)
+            "command": "pipx",
+            "commandline": "pipx install {}",
+        },
+        "npm": {  # npm (Node.js)
+            "command": "npm",
+            "commandline": "npm install -g {}",
+        },
+    }
+    if manager_name:
+        current_manager = available_managers.get(manager_name)
+    if not current_manager:
+        cit.err(f"Unsupported package manager: {manager_name}!")
+        return False
+    if not is_cmd_exist(current_manager["command"]):
+        cit.err(f"{manager_name} is not installed!")
+        return False
+    return run_cmd(current_manager["commandline"].format(package_name))
+
+
+def is_python3() -> bool:
+    """Check does the script is running in python3"""
+    return sys.version_info[0] == 3
+
+
+def is_admin() -> bool | None:
+    """Check does the script has admin privileges."""
+    import ctypes
+    if platform.system() == "Windows":  # Windows only
+        return ctypes.windll.shell32.IsUserAnAdmin()
+    return None
+
+
+def runas_admin(py_file: str) -> bool:
+    """Execute a python script with admin privileges.
+
+    Links:
+        Syntax of ShellExecuteW: https://docs.microsoft.com/en-us/windows/win32/api/shellapi/nf-shellapi-shellexecutew
+
+    Args:
+        py_file (str): The command line arguments passed to python. It should be the script path, such as `__file__`.
+
+    Returns:
+        bool: Command run success.
+    """
+    import ctypes
+    if not platform.system() == 'Windows':
+        return False
+    parent_window_handle = None  # no UI
+    operation = "runas"  # run as admin
+    executor = sys.executable  # python.exe
+    parameter = py_file
+    directory = None  # using current working directory.
+    SHOWNORMAL = 1  # SW_SHOWNORMAL
+    if not os.path.isfile(parameter):
+        raise FileNotFoundError(parameter)
+    return_code = ctypes.windll.shell32.ShellExecuteW(parent_window_handle, operation, executor, parameter, directory, SHOWNORMAL)
+    return return_code > 32  # should be greater than 32 if execute success
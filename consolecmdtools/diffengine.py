@@ -0,0 +1,247 @@
+import difflib
+import typing
+
+
+MAX_CHAIN = 64  # lines occur more than this in a region are not used as anchors by histogram diff
+MAX_COST = 1024  # Myers diff gives up when the edit distance of a region is larger than this
+
+
+def intern_lines(a: typing.Sequence, b: typing.Sequence) -> tuple[list, list]:
+    """Map every distinct line to a small int, so the comparisons are int comparisons."""
+    ids: dict = {}
+    a_ids = [ids.setdefault(line, len(ids)) for line in a]
+    b_ids = [ids.setdefault(line, len(ids)) for line in b]
+    return a_ids, b_ids
+
+
+def _myers(a: list, b: list, alo: int, ahi: int, blo: int, bhi: int, max_cost: int = MAX_COST) -> list | None:
+    """Find the matching blocks of a region by Myers' O(ND) algorithm.
+
+    Returns:
+        list: `[(i, j, n), ...]` in order, or None if the edit distance is larger than `max_cost`.
+    """
+    n, m = ahi - alo, bhi - blo
+    if not n or not m:
+        return []
+    max_d = min(n + m, max_cost)
+    offset = max_d + 1
+    v = [0] * (2 * max_d + 3)
+    trace = []
+    found = False
+    for d in range(max_d + 1):
+        trace.append(v[:])
+        for k in range(-d, d + 1, 2):
+            if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+                x = v[offset + k + 1]  # move down
+            else:
+                x = v[offset + k - 1] + 1  # move right
+            y = x - k
+            while x < n and y < m and a[alo + x] == b[blo + y]:  # follow the snake
+                x += 1
+                y += 1
+            v[offset + k] = x
+            if x >= n and y >= m:
+                found = True
+                break
+        if found:
+            break
+    if not found:
+        return None
+    points = []
+    x, y = n, m
+    for d in range(len(trace) - 1, -1, -1):
+        v = trace[d]
+        k = x - y
+        if k == -d or (k != d and v[offset + k - 1] < v[offset + k + 1]):
+            prev_k = k + 1
+        else:
+            prev_k = k - 1
+        prev_x = v[offset + prev_k]
+        prev_y = prev_x - prev_k
+        while x > prev_x and y > prev_y:
+            x -= 1
+            y -= 1
+            points.append((alo + x, blo + y))
+        x, y = prev_x, prev_y
+    blocks: list = []
+    for i, j in reversed(points):
+        if blocks and blocks[-1][0] + blocks[-1][2] == i and blocks[-1][1] + blocks[-1][2] == j:
+            blocks[-1][2] += 1
+        else:
+            blocks.append([i, j, 1])
+    return [tuple(block) for block in blocks]
+
+
+def _unique_anchors(a: list, b: list, alo: int, ahi: int, blo: int, bhi: int, positions: dict) -> list:
+    """Get the longest increasing sequence of `(i, j)` pairs of the lines which are unique in both sides."""
+    import bisect
+
+    b_counts: dict = {}
+    for j in range(blo, bhi):
+        b_counts[b[j]] = b_counts.get(b[j], 0) + 1
+    pairs = [(positions[b[j]][0], j) for j in range(blo, bhi) if b_counts[b[j]] == 1 and len(positions.get(b[j], ())) == 1]
+    if not pairs:
+        return []
+    tails: list = []  # the smallest `i` ends an increasing sequence of each length
+    tail_indexes: list = []
+    previous = [-1] * len(pairs)
+    for index, (i, _j) in enumerate(pairs):  # pairs are sorted by `j` already, find the LIS on `i`
+        length = bisect.bisect_left(tails, i)
+        if length == len(tails):
+            tails.append(i)
+            tail_indexes.append(index)
+        else:
+            tails[length] = i
+            tail_indexes[length] = index
+        previous[index] = tail_indexes[length - 1] if length else -1
+    result = []
+    index = tail_indexes[-1]
+    while index >= 0:
+        result.append(pairs[index])
+        index = previous[index]
+    return result[::-1]
+
+
+def _histogram(a: list, b: list) -> list:
+    """Find the matching blocks by patience diff on the unique lines, then histogram diff anchoring on the least frequent common lines, with Myers as fallback."""
+    blocks = []
+    regions = [(0, len(a), 0, len(b))]
+    while regions:
+        alo, ahi, blo, bhi = regions.pop()
+        start = 0  # common prefix
+        while alo + start < ahi and blo + start < bhi and a[alo + start] == b[blo + start]:
+            start += 1
+        if start:
+            blocks.append((alo, blo, start))
+            alo, blo = alo + start, blo + start
+        end = 0  # common suffix
+        while ahi - end > alo and bhi - end > blo and a[ahi - end - 1] == b[bhi - end - 1]:
+            end += 1
+        if end:
+            blocks.append((ahi - end, bhi - end, end))
+            ahi, bhi = ahi - end, bhi - end
+        if alo == ahi or blo == bhi:
+            continue
+        positions: dict = {}
+        for i in range(alo, ahi):
+            positions.setdefault(a[i], []).append(i)
+        anchors = _unique_anchors(a, b, alo, ahi, blo, bhi, positions)
+        if anchors:  # patience diff: split the region by all the lines unique in both sides at once
+            prev_i, prev_j = alo, blo
+            for i, j in anchors:
+                blocks.append((i, j, 1))
+                regions.append((prev_i, i, prev_j, j))
+                prev_i, prev_j = i + 1, j + 1
+            regions.append((prev_i, ahi, prev_j, bhi))
+            continue
+        best = None  # (count, -length, i, j)
+        j = blo
+        while j < bhi:
+            candidates = positions.get(b[j])
+            next_j = j + 1
+            if candidates and len(candidates) <= MAX_CHAIN and (best is None or len(candidates) <= best[0]):
+                for i in candidates:
+                    start_i, start_j = i, j
+                    while start_i > alo and start_j > blo and a[start_i - 1] == b[start_j - 1]:
+                        start_i -= 1
+                        start_j -= 1
+                    end_i, end_j = i + 1, j + 1
+                    while end_i < ahi and end_j < bhi and a[end_i] == b[end_j]:
+                        end_i += 1
+                        end_j += 1
+                    score = (len(candidates), start_i - end_i, start_i, start_j)
+                    if best is None or score < best:
+                        best = score
+                    next_j = max(next_j, end_j)
+            j = next_j
+        if best is None:  # no anchors, all common lines are too popular
+            myers_blocks = _myers(a, b, alo, ahi, blo, bhi) if any(line in positions for line in b[blo:bhi]) else []
+            blocks.extend(myers_blocks or [])
+            continue
+        _count, neg_length, i, j = best
+        length = -neg_length
+        blocks.append((i, j, length))
+        regions.append((alo, i, blo, j))
+        regions.append((i + length, ahi, j + length, bhi))
+    return blocks
+
+
+def _normalize(blocks: list, len_a: int, len_b: int) -> list:
+    """Sort and merge the adjacent blocks, and append the sentinel like `SequenceMatcher.get_matching_blocks()`."""
+    merged: list = []
+    for i, j, n in sorted(blocks):
+        if not n:
+            continue
+        if merged and merged[-1][0] + merged[-1][2] == i and merged[-1][1] + merged[-1][2] == j:
+            merged[-1][2] += n
+        else:
+            merged.append([i, j, n])
+    result = [tuple(block) for block in merged]
+    result.append((len_a, len_b, 0))
+    return result
+
+
+ENGINES = {
+    "histogram": _histogram,
+    "myers": lambda a, b: _myers(a, b, 0, len(a), 0, len(b)) or _histogram(a, b),  # histogram diff if the edit distance is too large
+}
+
+
+class _BlocksMatcher(difflib.SequenceMatcher):
+    """A `SequenceMatcher` with matching blocks computed by other engines, so `get_grouped_opcodes()` can be reused."""
+
+    def __init__(self, a: typing.Sequence, b: typing.Sequence, matching_blocks: list):
+        self.a, self.b = a, b
+        self.matching_blocks = matching_blocks
+        self.opcodes = None
+
+
+def matcher(a: typing.Sequence, b: typing.Sequence, engine: str | typing.Callable = "difflib") -> difflib.SequenceMatcher:
+    """Get a `SequenceMatcher` of the lines using the engine.
+
+    Args:
+        a (Sequence): The source lines.
+        b (Sequence): The target lines.
+        engine (str|callable): "difflib", "histogram", "myers", or a function `engine(a_ids: list[int], b_ids: list[int]) -> list[tuple[int, int, int]]` returns the matching blocks.
+    """
+    if engine == "difflib":
+        return difflib.SequenceMatcher(None, a, b)
+    engine_func = engine if callable(engine) else ENGINES.get(engine)
+    if engine_func is None:
+        raise ValueError(f"invalid diff engine '{engine}' ({'/'.join(['difflib', *ENGINES])})")
+    a_ids, b_ids = intern_lines(a, b)
+    return _BlocksMatcher(a, b, _normalize(engine_func(a_ids, b_ids), len(a), len(b)))
+
+
+def _format_range(start: int, stop: int) -> str:
+    """Convert the range to the "ed" format like `difflib.unified_diff()`."""
+    beginning = start + 1  # lines start numbering with one
+    length = stop - start
+    if length == 1:
+        return f"{beginning}"
+    if not length:
+        beginning -= 1  # empty ranges begin at line just before the range
+    return f"{beginning},{length}"
+
+
+def unified_diff(a: typing.Sequence, b: typing.Sequence, fromfile: str = "", tofile: str = "", n: int = 3, engine: str | typing.Callable = "difflib") -> typing.Generator[str, None, None]:
+    """Yield the unified diff lines hunk by hunk, in the same format as `difflib.unified_diff()` with `lineterm=""`."""
+    started = False
+    for group in matcher(a, b, engine).get_grouped_opcodes(n):
+        if not started:
+            started = True
+            yield f"--- {fromfile}"
+            yield f"+++ {tofile}"
+        first, last = group[0], group[-1]
+        yield f"@@ -{_format_range(first[1], last[2])} +{_format_range(first[3], last[4])} @@"
+        for tag, i1, i2, j1, j2 in group:
+            if tag == "equal":
+                for line in a[i1:i2]:
+                    yield " " + line
+                continue
+            if tag in ("replace", "delete"):
+                for line in a[i1:i2]:
+                    yield "-" + line
+            if tag in ("replace", "insert"):
+                for line in b[j1:j2]:
+                    yield "+" + line
@@ -0,0 +1,1202 @@
+import os
+import platform
+import json
+import io
+import pathlib
+import typing
+import shutil
+# !! some imports are lazy-loaded
+
+import consoleiotools as cit
+
+from .path import get_path
+
+
+def select_path(multiple: bool = False, dir: bool = False, *args, **kwargs):
+    """Open a file dialog to get file or dir path.
+
+    Args:
+        multiple (bool): The file dialog select multiple files, and return list.
+        dir (bool): The file dialog select dir not file.
+        *: Any additional args will considered as filedialog args.
+
+    Returns:
+        str: The path of selected file or dir.
+        list: The path list of selected files.
+    """
+    import tkinter
+    import tkinter.filedialog
+    tkapp = tkinter.Tk()
+    tkapp.withdraw()
+    tkapp.update()
+    if dir:
+        path = tkinter.filedialog.askdirectory(*args, **kwargs)
+    elif multiple:
+        path = tkinter.filedialog.askopenfilenames(*args, **kwargs)
+    else:
+        path = tkinter.filedialog.askopenfilename(*args, **kwargs)
+    tkapp.destroy()
+    return path
+
+
+def bfs_walk(root: str) -> typing.Generator[pathlib.Path, None, None]:
+    """Breadth First Search the `root` folder.
+
+    Args:
+        root (str): The root folder to traverse.
+
+    Yeilds:
+        pathlib.Path: The traversed path.
+    """
+    queue = [pathlib.Path(os.path.expanduser(root))]  # ensure `~` is expanded
+    while queue:
+        path = queue.pop(0)
+        yield path
+        if path.is_dir():  # path included `~` returns False
+            queue = [p for p in path.iterdir()] + queue  # insert into the front of the queue
+
+
+def get_paths(root: str, filter: typing.Callable | None = None, compact: bool = False):
+    """List folders and files under `root` folder with filter.
+
+    Args:
+        root (str): root folder to list.
+        filter (callable): a function to indicate if the folder or file should be returned. Defaults to return every path. `filter(path: str) -> bool`.
+        compact (bool): return a `PathList`, which stores the names under their folders instead of the full paths, for millions of paths. Defaults to False.
+
+    Returns:
+        list[str]: a list of paths that are filtered by `filter` or everything traversed.
+        PathList: the same paths in a compact list, if `compact` is True.
+    """
+    if compact:
+        return _walk_compact(root, filter)
+    paths = []
+    for path in bfs_walk(root):
+        if (not filter) or filter(path):
+            paths.append(str(path))
+    return paths
+
+
+def _walk_compact(root: str, filter: typing.Callable | None = None):
+    """Walk `root` in `bfs_walk` order, and add the names to a `PathList` under their folders, so the full paths of files are not kept."""
+    from .pathlist import PathList
+
+    def list_dir(dirpath: str) -> typing.Iterator[os.DirEntry]:
+        try:
+            with os.scandir(dirpath) as it:
+                return iter(list(it))
+        except OSError:  # permission denied, removed during walk, etc.
+            return iter(())
+
+    paths = PathList()
+    root_path = pathlib.Path(os.path.expanduser(root))  # ensure `~` is expanded
+    top = paths.add(str(root_path), entry=(not filter) or filter(root_path))
+    if not root_path.is_dir():
+        return paths
+    if str(root_path) == ".":  # `pathlib.Path(".") / name` is just `name`
+        top = -1
+    stack = [(list_dir(str(root_path)), top)]  # depth first, same order as `bfs_walk`
+    while stack:
+        entry = next(stack[-1][0], None)
+        if entry is None:
+            stack.pop()
+            continue
+        is_dir = entry.is_dir()
+        keep = (not filter) or filter(pathlib.Path(entry.path))
+        if not (keep or is_dir):
+            continue
+        node = paths.add(entry.name, stack[-1][1], entry=keep)  # a filtered out folder is kept as the parent of its children
+        if is_dir:
+            stack.append((list_dir(entry.path), node))
+    return paths
+
+
+def _match_any(patterns: typing.Sequence[str], name: str, relpath: str) -> bool:
+    """Check if the glob patterns match the name, or the relative path with "/" separators."""
+    import fnmatch
+
+    return any(fnmatch.fnmatch(name, pattern) or fnmatch.fnmatch(relpath, pattern) for pattern in patterns)
+
+
+def _iter_files(root: str, include: typing.Sequence[str] | None = None, exclude: typing.Sequence[str] | None = None) -> typing.Generator[str, None, None]:
+    """Walk `root` depth first, and yield the paths of the files.
+
+    The excluded folders are pruned without being listed. The included patterns only apply to files.
+    The symbolic links to folders are followed, and each folder is walked once.
+    """
+    root = os.path.expanduser(root)
+    if not os.path.isdir(root):
+        if os.path.isfile(root):
+            yield root
+        return
+    root_stat = os.stat(root)
+    visited = {(root_stat.st_dev, root_stat.st_ino)}  # (st_dev, st_ino) of the folders, to not loop by the symbolic links
+    stack = [(root, "")]
+    while stack:
+        dirpath, reldir = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = sorted(it, key=lambda entry: entry.name)
+        except OSError:  # permission denied, removed during walk, etc.
+            continue
+        subdirs = []
+        for entry in entries:
+            relpath = f"{reldir}/{entry.name}" if reldir else entry.name
+            if exclude and _match_any(exclude, entry.name, relpath):
+                continue
+            try:
+                if entry.is_dir():
+                    dir_stat = entry.stat()
+                    if (dir_stat.st_dev, dir_stat.st_ino) not in visited:  # skip a link to a folder walked already
+                        visited.add((dir_stat.st_dev, dir_stat.st_ino))
+                        subdirs.append((entry.path, relpath))
+                    continue
+                if not entry.is_file():
+                    continue
+            except OSError:
+                continue
+            if include and not _match_any(include, entry.name, relpath):
+                continue
+            yield entry.path
+        stack.extend(reversed(subdirs))  # popped in name order
+
+
+@cit.deprecated_by(get_paths)
+def get_files(root: str, filter: typing.Callable | None = None):
+    pass
+
+
+def _scan_tree(root: str, to_visible: typing.Callable | None, max_depth: int | None = None, max_children: int | None = None) -> typing.Generator[tuple, None, None]:
+    """Walk `root` in `ls_tree` order and yield the visible entries.
+
+    Each folder is listed by a single `os.scandir()` call, and the entry type is taken from the cached `DirEntry.is_dir()`.
+
+    Yields:
+        tuple: `(level, path, is_dir, more)`. `path` is a `pathlib.Path`, or `None` for the placeholder of `more` truncated children.
+    """
+    def has_visible(path: pathlib.Path, is_dir: bool) -> bool:
+        """Check if the path is visible, or has visible files or folders."""
+        if to_visible(path):
+            return True
+        if is_dir:
+            try:
+                with os.scandir(path) as it:
+                    return any(has_visible(pathlib.Path(entry.path), entry.is_dir()) for entry in it)
+            except OSError:
+                return False
+        return False
+
+    def walk(dirpath: str, level: int):
+        try:
+            with os.scandir(dirpath) as it:
+                entries = list(it)
+        except OSError:  # permission denied, removed during walk, etc.
+            return
+        shown = hidden = 0
+        for entry in entries:
+            path = pathlib.Path(entry.path)
+            is_dir = entry.is_dir()
+            if max_children is not None and shown >= max_children:  # only count the visible ones for the placeholder
+                hidden += has_visible(path, is_dir)
+                continue
+            if is_dir and (max_depth is None or level < max_depth):
+                if to_visible(path):  # stream the folder and its children directly
+                    yield (level, path, True, 0)
+                    yield from walk(entry.path, level + 1)
+                    shown += 1
+                else:  # only show the folder if anything inside is visible
+                    children = list(walk(entry.path, level + 1))
+                    if children:
+                        yield (level, path, True, 0)
+                        yield from children
+                        shown += 1
+            elif has_visible(path, is_dir):
+                yield (level, path, is_dir, 0)
+                shown += 1
+        if hidden:
+            yield (level, None, False, hidden)
+
+    if not to_visible:
+        return
+    root_path = pathlib.Path(os.path.expanduser(root))  # ensure `~` is expanded
+    root_is_dir = root_path.is_dir()
+    if root_is_dir and max_depth != 0:
+        if to_visible(root_path):
+            yield (0, root_path, True, 0)
+            yield from walk(str(root_path), 1)
+        else:
+            children = list(walk(str(root_path), 1))
+            if children:
+                yield (0, root_path, True, 0)
+                yield from children
+    elif has_visible(root_path, root_is_dir):
+        yield (0, root_path, root_is_dir, 0)
+
+
+def iter_tree(root: str, show_icon: bool = True, ascii: bool = False, to_visible: typing.Callable | None = lambda path: True, to_highlight: typing.Callable | None = lambda path: False, add_suffix: typing.Callable | None = None, max_depth: int | None = None, max_children: int | None = None, workers: int = 0, markup: bool = False) -> typing.Generator[str, None, None]:
+    """Yield the lines of the `ls_tree` output one by one.
+
+    Args:
+        root (str): root folder to list.
+        show_icon (bool): show icon for folders and files. Defaults to True.
+        ascii (bool): use ascii characters for tree structure. Defaults to False.
+        to_visible (callable): a function to indicate if the folder or file should be visible. Default to show every path. `to_visible(path: pathlib.Path) -> bool`.
+        to_highlight (callable): a function to indicate if the folder or file should be highlighted. Defaults to highlight nothing. `to_highlight(path: pathlib.Path) -> bool`.
+        add_suffix (callable): a function to append as suffix to the folder or file name. Defaults to None. `add_suffix(path: pathlib.Path) -> str`.
+        max_depth (int): only list folders and files up to this depth, `root` is depth 0. Defaults to None, no limit.
+        max_children (int): only list the first N children of each folder, the rest are summarized in one line. Defaults to None, no limit.
+        workers (int): run `to_highlight` and `add_suffix` on a thread pool of this size. The output order is kept. Defaults to 0, run in the current thread.
+        markup (bool): yield lines with rich markups for highlights and dims. Defaults to False, yield plain text.
+
+    Yields:
+        str: The line of the tree.
+    """
+    import collections
+
+    indent_stem = "|   " if ascii else "╷   "
+    indent_branch = "|-- " if ascii else "├── "
+    ellipsis = "..." if ascii else "…"
+
+    def decorate(path: pathlib.Path) -> tuple[bool, str]:
+        is_highlight = bool(to_highlight and to_highlight(path))
+        suffix = add_suffix(path) if add_suffix else ""
+        return is_highlight, suffix
+
+    def render(record: tuple, decoration: tuple[bool, str] | None) -> str:
+        level, path, is_dir, more = record
+        indent_deco = (indent_stem * (level - 1) + indent_branch) if level else ""
+        if markup and indent_deco:
+            indent_deco = f"[dim]{indent_deco}[/]"
+        if path is None:  # placeholder of truncated children
+            return f"{indent_deco}{ellipsis} {more} more"
+        is_highlight, suffix = decoration
+        path_text = path.name
+        icon = " " if not show_icon else ("📁" if is_dir else "📄")
+        if markup:
+            if is_highlight:  # highlight the path if needed
+                path_text = f"[u]{path_text}[/]"
+            if path.name.startswith("."):  # dim hidden files and folders
+                path_text = f"[dim]{path_text}[/]"
+        path_text = f"{path_text}{os.sep if is_dir else ''}"  # add "/" or "\" to the end of the folder name
+        return f"{indent_deco}{icon} {path_text} {suffix}"
+
+    records = _scan_tree(root, to_visible, max_depth=max_depth, max_children=max_children)
+    if workers <= 0:
+        for record in records:
+            yield render(record, decorate(record[1]) if record[1] is not None else None)
+        return
+    import concurrent.futures
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=workers) as pool:
+        pending: collections.deque = collections.deque()  # keep the output order
+        for record in records:
+            pending.append((record, pool.submit(decorate, record[1]) if record[1] is not None else None))
+            if len(pending) >= workers * 8:  # bounded lookahead
+                record, future = pending.popleft()
+                yield render(record, future.result() if future else None)
+        while pending:
+            record, future = pending.popleft()
+            yield render(record, future.result() if future else None)
+
+
+def ls_tree(root: str, show_icon: bool = True, ascii: bool = False, to_visible: typing.Callable | None = lambda path: True, to_highlight: typing.Callable | None = lambda path: False, add_suffix: typing.Callable | None = None, max_depth: int | None = None, max_children: int | None = None, workers: int = 0, as_str: bool = False) -> str | None:
+    """Print folders and files under `root` folder in tree structure.
+
+    Args:
+        root (str): root folder to list.
+        show_icon (bool): show icon for folders and files. Defaults to True.
+        ascii (bool): use ascii characters for tree structure. Defaults to False.
+        to_visible (callable): a function to indicate if the folder or file should be visible. Default to show every path. `to_visible(path: pathlib.Path) -> bool`.
+        to_highlight (callable): a function to indicate if the folder or file should be highlighted. Defaults to highlight nothing. `to_highlight(path: pathlib.Path) -> bool`.
+        add_suffix (callable): a function to append as suffix to the folder or file name. Defaults to None. `add_suffix(path: pathlib.Path) -> str`.
+        max_depth (int): only list folders and files up to this depth, `root` is depth 0. Defaults to None, no limit.
+        max_children (int): only list the first N children of each folder. Defaults to None, no limit.
+        workers (int): run `to_highlight` and `add_suffix` on a thread pool of this size. Defaults to 0, no thread pool.
+        as_str (bool): return the tree as plain text instead of printing it. Defaults to False.
+
+    Returns:
+        str: The tree in plain text if `as_str` is True, otherwise None.
+    """
+    options = dict(show_icon=show_icon, ascii=ascii, to_visible=to_visible, to_highlight=to_highlight, add_suffix=add_suffix, max_depth=max_depth, max_children=max_children, workers=workers)
+    if as_str:
+        return "\n".join(iter_tree(root, markup=False, **options))
+    CHUNK_SIZE = 256  # lines printed in one go
+    buffer = []
+    for line in iter_tree(root, markup=True, **options):
+        buffer.append(line)
+        if len(buffer) >= CHUNK_SIZE:
+            cit.print("\n".join(buffer), highlight=False)
+            buffer.clear()
+    if buffer:
+        cit.print("\n".join(buffer), highlight=False)
+    return None
+
+
+def human_size(size: int | float) -> str:
+    """Format the byte size in a human-readable way, like `1.5 KB`."""
+    for unit in ("B", "KB", "MB", "GB", "TB"):
+        if abs(size) < 1024 or unit == "TB":
+            return f"{size} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} TB"
+
+
+def tree_stats(root: str, top: int = 10, follow_symlinks: bool = False) -> dict:
+    """Gather the disk usage of `root` folder in one traversal.
+
+    Every folder is listed by `os.scandir()` once, and every file is stat-ed once.
+
+    Args:
+        root (str): root folder to measure.
+        top (int): how many largest files to keep. Defaults to 10.
+        follow_symlinks (bool): follow the symbolic links of files and folders. Defaults to False.
+
+    Returns:
+        dict: The statistics. E.g. {
+            "size": 1024,  # total size of files in bytes
+            "files": 2,  # files count
+            "dirs": 1,  # folders count, `root` excluded
+            "exts": {"txt": {"files": 2, "size": 1024}},  # breakdown by extension, "" for no extension
+            "largest": [(1000, "/root/folder/a.txt"), (24, "/root/b.txt")],  # (size, path) of the largest files
+            "dir_sizes": {"/root": 1024, "/root/folder": 1000},  # aggregated size of each folder
+        }
+    """
+    import heapq
+
+    root = os.path.abspath(os.path.expanduser(root))
+    stats: dict = {"size": 0, "files": 0, "dirs": 0, "exts": {}, "largest": [], "dir_sizes": {}}
+    largest: list = []  # min-heap of (size, path)
+    direct_sizes = {root: 0}
+    parents = {}
+    visited = set()  # (st_dev, st_ino) of the folders, to not loop by the symbolic links
+    if follow_symlinks:
+        try:
+            root_stat = os.stat(root)
+            visited.add((root_stat.st_dev, root_stat.st_ino))
+        except OSError:
+            pass
+    stack = [root]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                entries = list(it)
+        except OSError:  # permission denied, removed during walk, etc.
+            continue
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=follow_symlinks):
+                    if follow_symlinks:
+                        dir_stat = entry.stat()
+                        if (dir_stat.st_dev, dir_stat.st_ino) in visited:  # a link to a folder walked already
+                            continue
+                        visited.add((dir_stat.st_dev, dir_stat.st_ino))
+                    stats["dirs"] += 1
+                    direct_sizes[entry.path] = 0
+                    parents[entry.path] = dirpath
+                    stack.append(entry.path)
+                    continue
+                if not entry.is_file(follow_symlinks=follow_symlinks):
+                    continue
+                size = entry.stat(follow_symlinks=follow_symlinks).st_size
+            except OSError:
+                continue
+            stats["size"] += size
+            stats["files"] += 1
+            direct_sizes[dirpath] += size
+            ext = os.path.splitext(entry.name)[1].lstrip(".").lower()
+            ext_stats = stats["exts"].setdefault(ext, {"files": 0, "size": 0})
+            ext_stats["files"] += 1
+            ext_stats["size"] += size
+            if top > 0:
+                if len(largest) < top:
+                    heapq.heappush(largest, (size, entry.path))
+                elif size > largest[0][0]:
+                    heapq.heapreplace(largest, (size, entry.path))
+    dir_sizes = dict(direct_sizes)
+    for dirpath in sorted(parents, key=lambda d: d.count(os.sep), reverse=True):  # deepest first, add up to the parent
+        dir_sizes[parents[dirpath]] += dir_sizes[dirpath]
+    stats["largest"] = sorted(largest, reverse=True)
+    stats["dir_sizes"] = dir_sizes
+    return stats
+
+
+def stats_suffix(stats: dict, show_files: bool = True) -> typing.Callable:
+    """Make an `add_suffix` function for `ls_tree` that shows the sizes from `tree_stats`.
+
+    Args:
+        stats (dict): The result of `tree_stats()`.
+        show_files (bool): show the sizes of files too, which needs a stat for each file. Defaults to True.
+
+    Returns:
+        callable: `add_suffix(path: pathlib.Path) -> str`.
+    """
+    dir_sizes = stats.get("dir_sizes", {})
+
+    def add_suffix(path) -> str:
+        abspath = os.path.abspath(path)
+        if abspath in dir_sizes:
+            return f"({human_size(dir_sizes[abspath])})"
+        if show_files and os.path.isfile(abspath):
+            return f"({human_size(os.path.getsize(abspath))})"
+        return ""
+    return add_suffix
+
+
+def show_in_file_manager(path: str, ask: bool = False):
+    """Show file in Explorer/Finder/File Manager."""
+    import subprocess
+    import platform
+    if ask:
+        if platform.system() == "Windows":
+            file_manager = "Explorer"
+        elif platform.system() == "Darwin":
+            file_manager = "Finder"
+        else:
+            file_manager = "file manager"
+        cit.ask(f"Show in {file_manager}?")
+        if cit.get_choice(('Yes', 'No')) == 'No':
+            return False
+    if platform.system() == "Windows":
+        os.startfile(path)
+    elif platform.system() == "Darwin":
+        subprocess.Popen(["open", path])
+    else:  # Unix-like
+        subprocess.Popen(["xdg-open", path])
+
+
+def _is_same_file_content(path_a: str, path_b: str) -> bool:
+    """Compare the size first, then the content chunk by chunk without loading the whole files."""
+    CHUNK_SIZE = 1024 * 1024
+    if os.path.getsize(path_a) != os.path.getsize(path_b):
+        return False
+    with open(path_a, 'rb') as fa, open(path_b, 'rb') as fb:
+        while True:
+            chunk_a, chunk_b = fa.read(CHUNK_SIZE), fb.read(CHUNK_SIZE)
+            if chunk_a != chunk_b:
+                return False
+            if not chunk_a:
+                return True
+
+
+def iter_diff(a, b, meta: bool = False, force_str: bool = False, context: int = 0, engine: str | typing.Callable = "auto") -> typing.Generator[str, None, None]:
+    """Compare two strings, lists or files and yield their differences hunk by hunk. Same args as `diff()`."""
+    from . import diffengine
+
+    AUTO_DIFFLIB_LINES = 5000  # use `difflib` for small inputs, and histogram diff for large inputs
+
+    src, dst = {'raw': a}, {'raw': b}
+    for d in (src, dst):
+        d['path'] = None
+        if isinstance(d['raw'], str):
+            as_path = get_path(d['raw'])
+            if (not force_str) and as_path.exists:
+                d['label'] = as_path.basename  # filename will show in header of diffs
+                d['path'] = as_path.abs
+            else:
+                d['label'] = str(str)
+        else:
+            d['label'] = str(type(d['raw']))
+    if src['path'] and dst['path'] and _is_same_file_content(src['path'], dst['path']):  # fast path for identical files
+        return
+    for d in (src, dst):
+        if d['path']:
+            with open(d['path'], encoding='utf-8') as f:
+                d['content'] = f.readlines()
+        elif isinstance(d['raw'], str):
+            d['content'] = d['raw'].split('\n')  # convert str to list for comparison. Ex. ['str',]
+        else:
+            d['content'] = d['raw']
+    if src['content'] == dst['content']:  # fast path for identical contents
+        return
+    if engine == "auto":
+        engine = "difflib" if len(src['content']) + len(dst['content']) <= AUTO_DIFFLIB_LINES else "histogram"
+    diffs = diffengine.unified_diff(src['content'], dst['content'], n=context, fromfile=src['label'], tofile=dst['label'], engine=engine)
+    for index, ln in enumerate(diffs):
+        if meta or index >= 3:
+            yield ln.strip('\n')  # Ensure no \n returns
+
+
+def diff(a, b, meta: bool = False, force_str: bool = False, context: int = 0, engine: str | typing.Callable = "auto") -> list:
+    """Compare two strings, lists or files and return their differences as list.
+
+    Args:
+        a (str|list|file): The source of comparison.
+        b (str|list|file): The target of comparison.
+        meta (bool): Show the meta data in the first 3 lines.
+        force_str (bool): Set to `True` if you wanna force to compare `a` and `b` as string. Default is False.
+        context (int): Number of context lines returns with diffs. Default is 0, no context lines shows.
+        engine (str|callable): The diff algorithm. "difflib", "histogram", "myers", or a function returns the matching blocks of interned lines. Default is "auto", "difflib" for small inputs and "histogram" for large inputs.
+
+    Returns:
+        list: Diffs where the dst is not same as src. Only lines with diffs in the result. The first 2 lines are the header of diffs.
+    """
+    return list(iter_diff(a, b, meta=meta, force_str=force_str, context=context, engine=engine))
+
+
+def compare_trees(a: str, b: str, shallow: bool = True, workers: int = 8, diffs: bool = False, context: int = 0) -> dict:
+    """Compare two folders recursively, walking both of them at once.
+
+    Files are compared by size first, then by mtime if `shallow`, then by content chunk by chunk on a thread pool. The contents are never loaded into memory as a whole.
+
+    Args:
+        a (str): The source folder.
+        b (str): The target folder.
+        shallow (bool): Files with the same size and mtime are considered the same without reading them. Defaults to True.
+        workers (int): The size of the thread pool to compare file contents. Defaults to 8.
+        diffs (bool): Generate the diffs by `diff()` for the changed text files. Defaults to False.
+        context (int): Number of context lines of the diffs. Defaults to 0.
+
+    Returns:
+        dict: The relative paths sorted. E.g. {
+            "only_a": ["removed.txt", "removed_folder"],  # folders are not listed into
+            "only_b": ["added.txt"],
+            "changed": ["changed.txt"],
+            "same": ["same.txt"],
+            "diffs": {"changed.txt": ["-old", "+new"]},  # only when `diffs` is True
+        }
+    """
+    import concurrent.futures
+
+    TEXT_SNIFF_SIZE = 8192
+    root_a, root_b = (os.path.abspath(os.path.expanduser(root)) for root in (a, b))
+    result: dict = {"only_a": [], "only_b": [], "changed": [], "same": []}
+
+    def list_dir(path: str) -> dict:
+        try:
+            with os.scandir(path) as it:
+                return {entry.name: entry for entry in it}
+        except OSError:
+            return {}
+
+    def is_text(path: str) -> bool:
+        with open(path, 'rb') as f:
+            return b"\0" not in f.read(TEXT_SNIFF_SIZE)
+
+    def dir_key(path: str) -> tuple:
+        stat = os.stat(path)
+        return (stat.st_dev, stat.st_ino)
+
+    def collect(futures: typing.Iterable):
+        for future in futures:
+            try:
+                is_same = future.result()
+            except OSError:
+                is_same = False
+            result["same" if is_same else "changed"].append(pending.pop(future))
+
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        pending = {}  # {future: relpath}, bounded so a huge tree does not queue a future per file
+        max_pending = max(workers, 1) * 4
+        try:
+            visited = {(dir_key(root_a), dir_key(root_b))}  # the folder pairs walked, to not loop by the symbolic links
+        except OSError:
+            visited = set()
+        stack = [""]
+        while stack:
+            reldir = stack.pop()
+            entries_a = list_dir(os.path.join(root_a, reldir))
+            entries_b = list_dir(os.path.join(root_b, reldir))
+            for name in entries_a.keys() | entries_b.keys():
+                relpath = os.path.join(reldir, name)
+                entry_a, entry_b = entries_a.get(name), entries_b.get(name)
+                if entry_b is None:
+                    result["only_a"].append(relpath)
+                    continue
+                if entry_a is None:
+                    result["only_b"].append(relpath)
+                    continue
+                is_dir_a, is_dir_b = entry_a.is_dir(), entry_b.is_dir()
+                if is_dir_a and is_dir_b:
+                    try:
+                        pair = (dir_key(entry_a.path), dir_key(entry_b.path))
+                    except OSError:
+                        continue
+                    if pair not in visited:
+                        visited.add(pair)
+                        stack.append(relpath)
+                    continue
+                if is_dir_a != is_dir_b:  # a file in one tree and a folder in the other
+                    result["changed"].append(relpath)
+                    continue
+                try:
+                    stat_a, stat_b = entry_a.stat(), entry_b.stat()
+                except OSError:
+                    result["changed"].append(relpath)
+                    continue
+                if stat_a.st_size != stat_b.st_size:
+                    result["changed"].append(relpath)
+                elif shallow and stat_a.st_mtime_ns == stat_b.st_mtime_ns:
+                    result["same"].append(relpath)
+                else:
+                    pending[pool.submit(_is_same_file_content, entry_a.path, entry_b.path)] = relpath
+                    if len(pending) >= max_pending:
+                        done, _ = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                        collect(done)
+        collect(list(pending))
+    for key in result:
+        result[key].sort()
+    if diffs:
+        result["diffs"] = {}
+        for relpath in result["changed"]:
+            path_a, path_b = os.path.join(root_a, relpath), os.path.join(root_b, relpath)
+            try:
+                if os.path.isfile(path_a) and os.path.isfile(path_b) and is_text(path_a) and is_text(path_b):
+                    result["diffs"][relpath] = diff(path_a, path_b, context=context)
+            except (OSError, UnicodeDecodeError):  # not a utf-8 text file
+                continue
+    return result
+
+
+def _search_file(path: str, regex, sniff_size: int = 8192) -> list:
+    """Search a file by the compiled bytes regex on its memory map. Returns `[(line number, offset, line bytes)]`, one per matched line, or [] for a binary file."""
+    import mmap
+
+    COUNT_SIZE = 1024 * 1024
+    try:
+        with open(path, 'rb') as f:
+            if not f.read(1):  # empty file can not be mapped
+                return []
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                if b"\0" in mm[:sniff_size]:  # binary file
+                    return []
+                results = []
+                line_no, counted = 1, 0  # the line number at offset `counted`
+                match = regex.search(mm)
+                while match:
+                    start = match.start()
+                    while counted < start:  # count in bounded slices, not copying the whole gap between the matches
+                        line_no += mm[counted:min(counted + COUNT_SIZE, start)].count(b"\n")
+                        counted = min(counted + COUNT_SIZE, start)
+                    line_start = mm.rfind(b"\n", 0, start) + 1
+                    line_end = mm.find(b"\n", start)
+                    if line_end < 0:
+                        line_end = len(mm)
+                    results.append((line_no, start, mm[line_start:line_end]))
+                    if line_end >= len(mm):
+                        break
+                    match = regex.search(mm, max(line_end + 1, match.end()))  # one result per line
+                return results
+    except (OSError, ValueError):  # unreadable, or removed during search
+        return []
+
+
+def _search_batch(paths: list, regex) -> list:
+    return [(path, _search_file(path, regex)) for path in paths]
+
+
+def search_files(root: str, pattern, workers: int = 8, include: typing.Sequence[str] | None = None, exclude: typing.Sequence[str] | None = None, ignore_case: bool = False, batch_size: int = 64) -> typing.Generator[dict, None, None]:
+    """Search the contents of the files under `root` by a regex, and yield the matched lines as they are found.
+
+    Files are memory-mapped and matched as bytes without decoding, and binary files (with a NUL byte in the first 8KB) are skipped.
+    Unreadable files are skipped as well. With `workers` > 1, the files are searched in batches on a process pool, and the batches are yielded as they complete.
+
+    Args:
+        root (str): The root folder, or a file.
+        pattern (str|bytes|re.Pattern): The regex. A str is encoded as utf-8. `^` and `$` match at each line.
+        workers (int): The number of processes. Defaults to 8. 1 to search in this process.
+        include (list[str]): The glob patterns of the files to search, matched with the name or the relative path, like ["*.py"]. Defaults to all files.
+        exclude (list[str]): The glob patterns of the folders and files to skip, like [".git", "node_modules"]. Excluded folders are not listed. Defaults to None.
+        ignore_case (bool): Case-insensitive search. Defaults to False.
+        batch_size (int): Files searched in one task on the pool. Defaults to 64.
+
+    Yields:
+        dict: {"path": str, "line": int, "offset": int, "text": str}. The line number starts from 1, the offset is the byte offset of the match in the file, and the text is the matched line.
+    """
+    import re
+    import itertools
+
+    if isinstance(pattern, str):
+        pattern = pattern.encode("utf-8")
+    if isinstance(pattern, bytes):
+        pattern = re.compile(pattern, re.MULTILINE | (re.IGNORECASE if ignore_case else 0))
+    elif not isinstance(pattern.pattern, bytes):
+        raise TypeError("search_files() needs a bytes regex, compile the pattern from bytes")
+
+    def to_dicts(path: str, results: list) -> typing.Generator[dict, None, None]:
+        for line_no, offset, line in results:
+            yield {"path": path, "line": line_no, "offset": offset, "text": line.rstrip(b"\r").decode("utf-8", errors="replace")}
+
+    files = _iter_files(root, include, exclude)
+    first_batch = [path for _, path in zip(range(batch_size), files)]
+    if workers <= 1 or len(first_batch) < batch_size:  # a pool is not worth it
+        for path in itertools.chain(first_batch, files):
+            yield from to_dicts(path, _search_file(path, pattern))
+        return
+    import concurrent.futures
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {pool.submit(_search_batch, first_batch, pattern)}
+        try:
+            while pending:
+                while len(pending) < workers * 2:  # keep the pool busy, and the walk ahead by a bounded number of batches
+                    batch = [path for _, path in zip(range(batch_size), files)]
+                    if not batch:
+                        break
+                    pending.add(pool.submit(_search_batch, batch, pattern))
+                done, pending = concurrent.futures.wait(pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    for path, results in future.result():
+                        yield from to_dicts(path, results)
+        finally:  # the generator is closed early
+            for future in pending:
+                future.cancel()
+
+
+def _cache_dir(*subdirs: str) -> str:
+    """Get the cache folder of consolecmdtools, like `~/.cache/consolecmdtools`."""
+    if platform.system() == "Windows":
+        base = os.environ.get("LOCALAPPDATA") or os.path.join(os.path.expanduser("~"), "AppData", "Local")
+    else:
+        base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "consolecmdtools", *subdirs)
+
+
+def _load_json(filepath: str, default=None):
+    """Load the json file, or return `default` if the file does not exist or is broken."""
+    try:
+        with open(filepath, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {} if default is None else default
+
+
+def _save_json(filepath: str, data):
+    """Save the data as json atomically."""
+    import tempfile
+
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(filepath), prefix=".tmp-")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, filepath)
+    except BaseException:
+        os.remove(tmp_path)
+        raise
+
+
+ENCODINGS = ("utf-8", "gbk", "cp1252", "windows-1252", "latin-1", "ascii")  # the encodings tried in order
+
+BOMS = (  # longer BOMs first, utf-32-le starts with the utf-16-le BOM
+    (b"\xef\xbb\xbf", "utf-8-sig"),
+    (b"\xff\xfe\x00\x00", "utf-32"),
+    (b"\x00\x00\xfe\xff", "utf-32"),
+    (b"\xff\xfe", "utf-16"),
+    (b"\xfe\xff", "utf-16"),
+)
+
+
+def _detect_encoding(sample: bytes, is_complete: bool = False) -> str | None:
+    """Detect the encoding by BOM, or by the first encoding can decode the sample."""
+    import codecs
+
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    for encoding in ENCODINGS:
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=is_complete)  # the sample may end in the middle of a character
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return None
+
+
+def detect_encoding(filepath: str, sample_size: int = 64 * 1024) -> str | None:
+    """Detect the encoding of a file by its BOM, or by decoding a sample of the file head.
+
+    Args:
+        filepath (str): The file path.
+        sample_size (int): Bytes to read from the file head. Defaults to 64 KB.
+
+    Returns:
+        str: The encoding name, like "utf-8". None if no encoding fits.
+    """
+    with open(filepath, 'rb') as f:
+        sample = f.read(sample_size)
+        is_complete = not f.read(1)
+    return _detect_encoding(sample, is_complete=is_complete)
+
+
+def read_file(filepath, *args, **kwargs) -> str:
+    """Read a text file with its encoding detected automatically.
+
+    The encoding is detected by the BOM and a sample of the file head, then the file is read from disk once and decoded.
+    If the rest of the file cannot be decoded, the other encodings are tried on the bytes already read.
+
+    Args:
+        filepath (str): The file path.
+        encoding (str): Use this encoding instead of detecting it. Defaults to None.
+        newline (str): Same as `open()`. Defaults to None, universal newlines mode.
+        errors (str): Same as `open()`. Defaults to "strict".
+        *: Any other args are passed to `open()`, and the file is opened once per encoding tried.
+
+    Returns:
+        str: The content of the file.
+    """
+    SAMPLE_SIZE = 64 * 1024
+    encoding = kwargs.pop('encoding', None)
+    newline = kwargs.pop('newline', None)
+    errors = kwargs.pop('errors', None) or 'strict'
+    with open(filepath, 'rb') as f:
+        raw = f.read(SAMPLE_SIZE + 1) if (args or kwargs) else f.read()  # only the sample to detect, if the file is opened with the args
+
+    def decode(mode: str, errors: str = errors) -> str:
+        if args or kwargs:
+            with open(filepath, *args, encoding=mode, errors=errors, newline=newline, **kwargs) as f:
+                return f.read()
+        with io.TextIOWrapper(io.BytesIO(raw), encoding=mode, errors=errors, newline=newline) as f:
+            return f.read()
+
+    detected = encoding or _detect_encoding(raw[:SAMPLE_SIZE], is_complete=len(raw) <= SAMPLE_SIZE)
+    candidates = [detected] if detected else []
+    candidates += [mode for mode in ENCODINGS if mode != detected and not encoding]
+    for mode in candidates:
+        try:
+            content = decode(mode)
+            cit.info("File is read in {} mode.".format(mode))
+            return content
+        except UnicodeDecodeError:
+            cit.warn("File cannot be opened in {} mode".format(mode))
+    content = decode('ascii', errors='surrogateescape')
+    cit.info("File is read in ASCII surrogate escape mode.")
+    return content
+
+
+def iter_lines(filepath: str, encoding: str | None = None) -> typing.Generator[str, None, None]:
+    """Yield the lines of a text file one by one, with its encoding detected automatically.
+
+    If a line cannot be decoded in the detected encoding, the next encoding in `ENCODINGS` which can decode it is used from then on.
+
+    Args:
+        filepath (str): The file path.
+        encoding (str): Use this encoding instead of detecting it. Defaults to None.
+
+    Yields:
+        str: The line, ends with "\\n" except the last line.
+    """
+    encoding = encoding or detect_encoding(filepath) or "ascii"
+    if encoding.startswith(("utf-16", "utf-32")):  # not ascii compatible, cannot split the lines by b"\n"
+        with open(filepath, encoding=encoding) as f:
+            yield from f
+        return
+    fallbacks = [mode for mode in ENCODINGS if mode != encoding]
+    with open(filepath, 'rb') as f:
+        for raw_line in f:
+            while True:
+                try:
+                    line = raw_line.decode(encoding)
+                    break
+                except UnicodeDecodeError:
+                    if not fallbacks:
+                        line = raw_line.decode("ascii", errors="surrogateescape")
+                        break
+                    encoding = fallbacks.pop(0)
+            if line.endswith("\r\n"):  # universal newlines
+                line = line[:-2] + "\n"
+            yield line
+
+
+def copy_file(*args, **kwargs) -> str:
+    """Copy file from one place to another.
+
+    Args:
+        *args, **kwargs: All the arguments and keyword arguments will be passed to `move_file` function, except `copy` is set to `True`. Copying when moving is logical, moving when copying is not.
+
+    Returns:
+        Returns whatever `move_file` returns.
+    """
+    kwargs['copy'] = True  # Override the `copy` argument to `True`
+    return move_file(*args, **kwargs)
+
+
+COPY_METHODS = ("reflink", "copy_file_range", "copy2")
+
+FICLONE = 0x40049409  # ioctl of Linux to share the data blocks of files on Btrfs/XFS
+
+
+def _copy_data(fsrc, fdst, method: str):
+    """Copy the data between the opened files by the zero-copy method, raises OSError if it is not supported."""
+    if method == "reflink":
+        import fcntl
+
+        fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+    elif method == "copy_file_range":
+        size = os.fstat(fsrc.fileno()).st_size
+        if size <= 0:  # special files like /proc/* report size 0, only a read() gets their content
+            raise OSError(f"copy_file_range is not reliable for {fsrc.name!r} of size 0")
+        total = 0
+        while copied := os.copy_file_range(fsrc.fileno(), fdst.fileno(), max(size, 1024 * 1024)):  # until the end, even if the file grows or shrinks
+            total += copied
+        if not total:
+            raise OSError(f"copy_file_range copied nothing from {fsrc.name!r}")
+    else:
+        raise ValueError(f"invalid copy method '{method}' ({'/'.join(COPY_METHODS)})")
+
+
+def clone_file(src: str, dst: str, methods: typing.Sequence[str] = COPY_METHODS) -> str:
+    """Copy the file content and metadata by the fastest method supported, in the order of `methods`.
+
+    "reflink" clones the file in constant time without extra space on Btrfs/XFS, "copy_file_range" copies in the kernel on Linux, and "copy2" is `shutil.copy2()`.
+
+    Args:
+        src (str): Source file path.
+        dst (str): Destination file path, or a folder to copy into.
+        methods (Sequence[str]): The methods to try in order. Defaults to `("reflink", "copy_file_range", "copy2")`.
+
+    Returns:
+        str: The method used.
+    """
+    if os.path.isdir(dst):
+        dst = os.path.join(dst, os.path.basename(src))
+    if os.path.exists(dst) and os.path.samefile(src, dst):
+        raise shutil.SameFileError(f"{src!r} and {dst!r} are the same file")
+    for method in methods:
+        if method == "copy2":
+            shutil.copy2(src, dst)
+            return method
+        if method == "reflink" and platform.system() != "Linux":
+            continue
+        if method == "copy_file_range" and not hasattr(os, "copy_file_range"):
+            continue
+        try:
+            with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+                _copy_data(fsrc, fdst, method)
+        except OSError:  # not supported by the filesystem, try the next method
+            continue
+        shutil.copystat(src, dst)
+        return method
+    raise OSError(f"failed to copy {src!r} to {dst!r} by {'/'.join(methods)}")
+
+
+def _delta_copy(src: str, dst: str, block_size: int = 1024 * 1024) -> int:
+    """Update `dst` in place to be the same as `src`, only the blocks differ are written.
+
+    Returns:
+        int: The bytes written.
+    """
+    written = 0
+    src_size = os.path.getsize(src)
+    with open(src, 'rb') as fsrc, open(dst, 'r+b') as fdst:
+        offset = 0
+        while True:
+            src_block = fsrc.read(block_size)
+            if not src_block:
+                break
+            dst_block = fdst.read(len(src_block))
+            if src_block != dst_block:
+                fdst.seek(offset)
+                fdst.write(src_block)
+                written += len(src_block)
+            offset += len(src_block)
+            fdst.seek(offset)
+        fdst.truncate(src_size)  # drop the extra tail if `dst` was larger
+    shutil.copystat(src, dst)
+    return written
+
+
+BACKUP_STRATEGIES = ("copy", "hardlink", "reflink", "rename")
+
+
+def _backup_file(filepath: str, strategy: str = "copy") -> str:
+    """Backup the file to `<filepath>.backup.<timestamp>` by the strategy.
+
+    Args:
+        filepath (str): The file to backup.
+        strategy (str): "copy" copies the file by `shutil.copy2()`. "hardlink" links the file without copying, the file must be replaced but not written in place afterwards. "reflink" clones the file by `clone_file()`. "rename" moves the file aside.
+
+    Returns:
+        str: The backup file path.
+    """
+    import time
+
+    if strategy not in BACKUP_STRATEGIES:
+        raise ValueError(f"invalid backup strategy '{strategy}' ({'/'.join(BACKUP_STRATEGIES)})")
+    import glob
+
+    base = f"{filepath}.backup.{time.strftime('%Y%m%d%H%M%S')}"
+    counts = [int(suffix) for path in glob.glob(glob.escape(base) + ".*") if (suffix := path[len(base) + 1:]).isdigit()]
+    if counts or os.path.lexists(base):  # more than one backup in a second, numbered after the latest one
+        backup_path = f"{base}.{max(counts, default=0) + 1}"
+    else:
+        backup_path = base
+    if strategy == "copy":
+        shutil.copy2(filepath, backup_path)
+    elif strategy == "hardlink":
+        os.link(filepath, backup_path)
+    elif strategy == "reflink":
+        clone_file(filepath, backup_path)
+    else:
+        os.rename(filepath, backup_path)
+    return backup_path
+
+
+def rotate_backups(filepath: str, keep: int | None = None, max_size: int | None = None) -> list:
+    """Delete the oldest backups of the file made by `move_file(backup=...)`.
+
+    Args:
+        filepath (str): The file of the backups.
+        keep (int): Keep the last N backups. None means no limit.
+        max_size (int): Keep the last backups under the total bytes. The latest backup is always kept. None means no limit.
+
+    Returns:
+        list: The deleted backup file paths.
+    """
+    import re
+    import glob
+
+    pattern = re.compile(r"\.backup\.(\d{14})(?:\.(\d+))?")
+    backups = []  # [(timestamp, count, path)]
+    for path in glob.glob(glob.escape(filepath) + ".backup.*"):
+        if match := pattern.fullmatch(path[len(filepath):]):
+            backups.append((match[1], int(match[2] or 0), path))
+    backups = [path for _timestamp, _count, path in sorted(backups, reverse=True)]  # the latest first
+    deleted = []
+    total = 0
+    for index, backup_path in enumerate(backups):
+        total += os.path.getsize(backup_path)
+        if (keep is not None and index >= keep) or (max_size is not None and index and total > max_size):
+            os.remove(backup_path)
+            deleted.append(backup_path)
+    return deleted
+
+
+def move_file(src: str, dst: str, copy: bool = False, backup: bool | str = False, ensure: bool = False, msgout: typing.Callable | None = None, delta: bool = False, backup_keep: int | None = None, backup_max_size: int | None = None) -> str:
+    """Move or copy file from one place to another.
+
+    Args:
+        src (str): Source file path.
+        dst (str): Destination file path.
+        copy (bool): Copy or move source file to destination.
+        backup (bool|str): Backup destination file or not. `True` means try to backup destination file, pass if destination file does not exist. A strategy name "copy" (same as `True`), "hardlink", "reflink" or "rename" backups without copying the data.
+        ensure (bool): Ensure the destination parent directory exists or not. `True` means create the parent directory if not exists, and ignore if the parent directory exists.
+        msgout (callable): Output function to handle the outputs. `None` means no outputs.
+        delta (bool): When copying onto an existing file, compare them block by block and only write the blocks differ. The destination is updated in place, not atomically. Ignored if the backup is a hardlink or renamed. Defaults to False.
+        backup_keep (int): Keep the last N backups, delete the older ones. None means no limit.
+        backup_max_size (int): Keep the last backups under the total bytes, delete the older ones. None means no limit.
+
+    Returns:
+        str: The destination file path.
+    """
+    def _msg(message):
+        if msgout:
+            msgout(message)
+    _msg(f"Source File: {src}")
+    src = get_path(src)
+    _msg(f"Destination File: {dst}")
+    dst = get_path(dst)
+    if copy:
+        _msg("Copy Enabled.")
+    if backup:
+        _msg("Backup Enabled.")
+    if ensure:
+        _msg("Ensure Enabled.")
+    if not src.exists:
+        raise FileNotFoundError("Source file does not exist.")
+    if ensure:
+        if not dst.parent.exists:
+            os.makedirs(dst.parent, exist_ok=True)
+            _msg(f"Destination file parent directory created: {dst.parent}")
+    strategy = "copy" if backup is True else backup
+    if dst.exists:
+        if backup:
+            dst_backup = _backup_file(dst, strategy)
+            _msg(f"Destination file backuped up to `{dst_backup}` by {strategy}.")
+            for deleted in rotate_backups(dst, keep=backup_keep, max_size=backup_max_size):
+                _msg(f"Old backup `{deleted}` deleted.")
+        else:
+            _msg("Warning: Destination file already exists and will be overwritten.")
+    else:
+        if backup:
+            _msg("Warning: Destination file does not exist, backup skipped.")
+    if backup and strategy == "hardlink" and os.path.isfile(dst):
+        os.remove(dst)  # the backup is the same inode, so `dst` must be replaced, not written in place by a copy or a cross-device move. The data is kept by the backup link.
+    if copy:
+        if delta and dst.is_file:
+            written = _delta_copy(src, dst)
+            _msg(f"File {src} delta copied to {dst}, {written} bytes written.")
+            return dst
+        method = clone_file(src, dst)
+        _msg(f"File {src} copied to {dst} by {method}.")
+        return os.path.join(dst, os.path.basename(src)) if os.path.isdir(dst) else dst
+    else:
+        _msg(f"File {src} moved to {dst}.")
+        return shutil.move(src, dst)
+
+
+def _transfer_files(pairs: typing.Iterable[tuple], copy: bool, workers: int, ensure: bool, progress: typing.Callable | None) -> dict:
+    """Copy or move many files. See `copy_files()` and `move_files()`."""
+    import errno
+    import concurrent.futures
+
+    pairs = [(os.fspath(src), os.fspath(dst)) for src, dst in pairs]
+    result = {"done": 0, "bytes": 0, "errors": {}}
+    total = len(pairs)
+    if ensure:
+        for parent in sorted({os.path.dirname(os.path.abspath(dst)) for _src, dst in pairs}):  # each folder is created once
+            try:
+                os.makedirs(parent, exist_ok=True)
+            except OSError:
+                pass  # reported by the file in it
+
+    def _done(src: str, size: int, error: Exception | None):
+        if error is None:
+            result["done"] += 1
+            result["bytes"] += size
+        else:
+            result["errors"][src] = error
+        if progress:
+            progress(result["done"] + len(result["errors"]), total, result["bytes"])
+
+    queued = []  # [(src, dst, size)] to copy on the pool
+    for src, dst in pairs:
+        try:
+            size = os.stat(src).st_size
+        except OSError as e:
+            _done(src, 0, e)
+            continue
+        if not copy:
+            try:
+                os.replace(src, dst)  # same filesystem, no data is copied
+                _done(src, size, None)
+                continue
+            except OSError as e:
+                if e.errno != errno.EXDEV:
+                    _done(src, size, e)
+                    continue
+        queued.append((src, dst, size))
+    if not queued:
+        return result
+    transfer = clone_file if copy else shutil.move
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(workers, 1)) as pool:
+        futures = {pool.submit(transfer, src, dst): (src, size) for src, dst, size in queued}
+        for future in concurrent.futures.as_completed(futures):
+            src, size = futures[future]
+            _done(src, size, future.exception())
+    return result
+
+
+def copy_files(pairs: typing.Iterable[tuple], workers: int = 8, ensure: bool = True, progress: typing.Callable | None = None) -> dict:
+    """Copy many files at once. The destination folders are created once for all, and the files are copied on a thread pool.
+
+    An error of one file is reported in the result, and does not stop the others.
+
+    Args:
+        pairs (Iterable[tuple]): The `(src, dst)` file paths. Existing destination files are overwritten.
+        workers (int): The max number of concurrent copies. Defaults to 8.
+        ensure (bool): Create the destination parent folders if not exist. Defaults to True.
+        progress (callable): `progress(finished: int, total: int, bytes: int)` is called after each file.
+
+    Returns:
+        dict: {"done": int, "bytes": int, "errors": {src: Exception}}.
+    """
+    return _transfer_files(pairs, copy=True, workers=workers, ensure=ensure, progress=progress)
+
+
+def move_files(pairs: typing.Iterable[tuple], workers: int = 8, ensure: bool = True, progress: typing.Callable | None = None) -> dict:
+    """Move many files at once. Files on the same filesystem are renamed, the others are copied and removed on a thread pool.
+
+    Same args and returns as `copy_files()`.
+    """
+    return _transfer_files(pairs, copy=False, workers=workers, ensure=ensure, progress=progress)
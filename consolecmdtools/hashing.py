@@ -0,0 +1,31 @@
+import os
+
+
+def md5(target: str | bytes, force_text: bool = False) -> str:
+    """Generate MD5 hash for bytes, str, int, file, etc."""
+    import hashlib
+
+    if not target:
+        return ""
+    if not force_text and os.path.isfile(target):  # if target is a file
+        with open(target, 'rb') as f:
+            content = f.read().replace(os.linesep.encode(), b"\n")  # universal newline
+            return hashlib.md5(content).hexdigest()
+    if not isinstance(target, bytes):  # the input of hashlib.md5() should be type of bytes
+        target = str(target).encode()
+    return hashlib.md5(target).hexdigest()
+
+
+def crc32(target: str | bytes, force_text: bool = False) -> int:
+    """Generate CRC32 hash for bytes, str, int, file, etc."""
+    import binascii
+
+    if not target:
+        return 0
+    if not force_text and os.path.isfile(target):  # if target is a file
+        with open(target, 'rb') as f:
+            content = f.read().replace(os.linesep.encode(), b"\n")  # universal newline
+            return binascii.crc32(content)
+    if not isinstance(target, bytes):  # if target is str/int/float, the input of binascii.crc32() should be type of bytes
+        target = str(target).encode()
+    return binascii.crc32(target)
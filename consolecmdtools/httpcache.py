@@ -0,0 +1,210 @@
+import os
+import json
+import time
+import hashlib
+import threading
+import typing
+import urllib.error
+import urllib.request
+
+
+class ResponseCache:
+    """On-disk cache of HTTP responses, keyed by the method, url and payload.
+
+    The freshness follows `Cache-Control: max-age`, `no-cache`, `no-store` and `Expires` of the response, or `ttl` if the response has none of them.
+    A stale response is revalidated with its ETag/Last-Modified. Least recently used responses are evicted when the cache is larger than `max_size`.
+
+    Attributes:
+        cache_dir (str): The folder to save the responses.
+        max_size (int): Max bytes of the cached bodies.
+        ttl (float): Seconds a response is fresh if the response has no caching headers.
+        stale_while_revalidate (bool): Return a stale response immediately, and revalidate it in the background.
+    """
+
+    def __init__(self, cache_dir: str | None = None, max_size: int = 100 * 1024 * 1024, ttl: float = 60.0, stale_while_revalidate: bool = False):
+        if cache_dir is None:
+            from .fs import _cache_dir
+
+            cache_dir = _cache_dir("http")
+        self.cache_dir = cache_dir
+        self.max_size = max_size
+        self.ttl = ttl
+        self.stale_while_revalidate = stale_while_revalidate
+        self._lock = threading.Lock()
+        self._revalidating: set = set()
+
+    def __repr__(self) -> str:
+        return f"ResponseCache({self.cache_dir!r})"
+
+    @staticmethod
+    def _describe(source) -> tuple[str, str, bytes]:
+        if isinstance(source, urllib.request.Request):
+            return source.get_method(), source.full_url, source.data or b""
+        return "GET", source, b""
+
+    def key(self, source) -> str:
+        """Get the cache key of the request, from its method, url and payload."""
+        method, url, body = self._describe(source)
+        return hashlib.sha256(b"\0".join((method.upper().encode(), url.encode(), body))).hexdigest()
+
+    def _paths(self, key: str) -> tuple[str, str]:
+        return os.path.join(self.cache_dir, key + ".json"), os.path.join(self.cache_dir, key + ".bin")
+
+    def _load(self, key: str) -> dict | None:
+        meta_path, body_path = self._paths(key)
+        try:
+            with open(meta_path, encoding="utf-8") as f:
+                meta = json.load(f)
+            with open(body_path, "rb") as f:
+                meta["content"] = f.read()
+        except (OSError, ValueError):
+            return None
+        os.utime(body_path)  # mark as recently used
+        return meta
+
+    def _expires_at(self, headers) -> float | None:
+        """Get the expiry time from the response headers. None means the response should not be stored."""
+        import email.utils
+
+        now = time.time()
+        directives = {}
+        for directive in (headers.get("Cache-Control") or "").split(","):
+            name, _, value = directive.strip().partition("=")
+            directives[name.lower()] = value.strip('"')
+        if "no-store" in directives:
+            return None
+        if "no-cache" in directives:
+            return now  # stored, but revalidated every time
+        if directives.get("max-age", "").isdigit():
+            return now + int(directives["max-age"])
+        if headers.get("Expires"):
+            try:
+                return email.utils.parsedate_to_datetime(headers["Expires"]).timestamp()
+            except (TypeError, ValueError):
+                return now
+        return now + self.ttl
+
+    def _store(self, key: str, source, content: bytes, headers):
+        expires_at = self._expires_at(headers)
+        if expires_at is None:
+            return
+        method, url, _body = self._describe(source)
+        meta = {
+            "method": method,
+            "url": url,
+            "expires_at": expires_at,
+            "etag": headers.get("ETag"),
+            "last_modified": headers.get("Last-Modified"),
+        }
+        meta_path, body_path = self._paths(key)
+        os.makedirs(self.cache_dir, exist_ok=True)
+        for path, data in ((body_path, content), (meta_path, json.dumps(meta).encode())):
+            tmp_path = f"{path}.tmp{os.getpid()}.{threading.get_ident()}"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        self.evict()
+
+    def evict(self):
+        """Delete the least recently used responses until the cache is not larger than `max_size`."""
+        with self._lock:
+            try:
+                entries = [(entry.stat().st_mtime, entry.stat().st_size, entry.path) for entry in os.scandir(self.cache_dir) if entry.name.endswith(".bin")]
+            except OSError:
+                return
+            total = sum(size for _mtime, size, _path in entries)
+            for _mtime, size, body_path in sorted(entries):
+                if total <= self.max_size:
+                    break
+                for path in (body_path, body_path[:-len(".bin")] + ".json"):
+                    try:
+                        os.remove(path)
+                    except OSError:
+                        pass
+                total -= size
+
+    def clear(self):
+        """Delete all the cached responses."""
+        try:
+            entries = list(os.scandir(self.cache_dir))
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name.endswith((".bin", ".json")):
+                os.remove(entry.path)
+
+    def _refresh(self, key: str, source, opener: typing.Callable, cached: dict | None) -> bytes:
+        """Fetch the response, revalidate with ETag/Last-Modified if cached, and store it."""
+        from .net import _request_with_headers
+
+        headers = {}
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        try:
+            with opener(_request_with_headers(source, headers) if headers else source) as response:
+                content = response.read()
+                response_headers = response.headers
+        except urllib.error.HTTPError as e:
+            if e.code == 304 and cached:  # Not Modified, refresh the expiry only
+                self._store(key, source, cached["content"], _merge_headers(cached, e.headers))
+                return cached["content"]
+            raise
+        self._store(key, source, content, response_headers)
+        return content
+
+    def _refresh_in_background(self, key: str, source, opener: typing.Callable, cached: dict):
+        with self._lock:
+            if key in self._revalidating:
+                return
+            self._revalidating.add(key)
+
+        def refresh():
+            try:
+                self._refresh(key, source, opener, cached)
+            except Exception:
+                pass  # keep the stale response
+            finally:
+                with self._lock:
+                    self._revalidating.discard(key)
+        threading.Thread(target=refresh, daemon=True).start()
+
+    def fetch(self, source, opener: typing.Callable) -> bytes:
+        """Get the response content from the cache, or by `opener(source)` and store it.
+
+        Args:
+            source (str|Request): The target url.
+            opener (callable): The function opens the url, returns a response with `read()` and `headers`.
+
+        Returns:
+            bytes: The content of the response.
+        """
+        key = self.key(source)
+        cached = self._load(key)
+        if cached and cached["expires_at"] > time.time():
+            return cached["content"]
+        if cached and self.stale_while_revalidate:
+            self._refresh_in_background(key, source, opener, cached)
+            return cached["content"]
+        return self._refresh(key, source, opener, cached)
+
+
+def _merge_headers(cached: dict, headers) -> dict:
+    """Merge the headers of 304 Not Modified into the cached validators."""
+    merged = {"ETag": cached.get("etag"), "Last-Modified": cached.get("last_modified")}
+    for name in ("Cache-Control", "Expires", "ETag", "Last-Modified"):
+        if headers and headers.get(name):
+            merged[name] = headers[name]
+    return merged
+
+
+_default_cache = None
+
+
+def default_cache() -> ResponseCache:
+    """Get the shared response cache in the user cache folder."""
+    global _default_cache
+    if _default_cache is None:
+        _default_cache = ResponseCache()
+    return _default_cache
@@ -0,0 +1,130 @@
+import zlib
+
+try:
+    import brotli  # optional, `pip install brotli`
+except ImportError:
+    brotli = None
+
+
+CHUNK_SIZE = 64 * 1024  # compressed bytes read from the response in one go
+ACCEPT_ENCODING = "gzip, deflate, br" if brotli else "gzip, deflate"
+
+
+class _DeflateDecoder:
+    """Decode "deflate", which is zlib-wrapped by the spec, but raw deflate by some servers."""
+
+    def __init__(self):
+        self._decoder = zlib.decompressobj()
+        self._first = True
+
+    def decompress(self, data: bytes) -> bytes:
+        if self._first and data:
+            self._first = False
+            try:
+                return self._decoder.decompress(data)
+            except zlib.error:  # raw deflate without the zlib header
+                self._decoder = zlib.decompressobj(-zlib.MAX_WBITS)
+        return self._decoder.decompress(data)
+
+    def flush(self) -> bytes:
+        return self._decoder.flush()
+
+
+class _BrotliDecoder:
+    def __init__(self):
+        self._decoder = brotli.Decompressor()
+
+    def decompress(self, data: bytes) -> bytes:
+        return self._decoder.process(data)
+
+    def flush(self) -> bytes:
+        return b""
+
+
+def _decoder(encoding: str):
+    """Get the streaming decoder of the Content-Encoding. None if it is not compressed."""
+    encoding = (encoding or "").strip().lower()
+    if encoding in ("gzip", "x-gzip"):
+        return zlib.decompressobj(16 + zlib.MAX_WBITS)
+    if encoding == "deflate":
+        return _DeflateDecoder()
+    if encoding == "br" and brotli:
+        return _BrotliDecoder()
+    return None
+
+
+class DecodedResponse:
+    """Wrap a response and decompress its body as it streams in.
+
+    Attributes:
+        url (str): The final url.
+        status (int): The HTTP status code.
+        reason (str): The HTTP reason phrase.
+        headers (http.client.HTTPMessage): The response headers, as received.
+    """
+
+    def __init__(self, response, decoder):
+        self._response = response
+        self._decoder = decoder
+        self._buffer = b""
+        self._eof = False
+        self.url = response.geturl()
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+
+    def __enter__(self) -> 'DecodedResponse':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def getcode(self) -> int:
+        return self.status
+
+    def geturl(self) -> str:
+        return self.url
+
+    def read(self, amt: int | None = None) -> bytes:
+        """Read the decoded body, or up to `amt` bytes of the decoded body."""
+        chunks = [self._buffer]  # joined once at the end, appending to a bytes copies it for each chunk
+        size = len(self._buffer)
+        while not self._eof and (amt is None or size < amt):
+            data = self._response.read(CHUNK_SIZE)
+            if data:
+                decoded = self._decoder.decompress(data)
+            else:
+                decoded = self._decoder.flush()
+                self._eof = True
+            chunks.append(decoded)
+            size += len(decoded)
+        data = b"".join(chunks)
+        if amt is None:
+            self._buffer = b""
+            return data
+        self._buffer = data[amt:]  # the leftover of the last chunk, read by the next call
+        return data[:amt]
+
+    def close(self):
+        self._response.close()
+
+
+def decode(response):
+    """Wrap the response to decompress the body by its Content-Encoding, or return it as is if it is not compressed."""
+    decoder = _decoder(response.headers.get("Content-Encoding"))
+    return DecodedResponse(response, decoder) if decoder else response
+
+
+def compress(data: bytes, encoding: str = "gzip") -> bytes:
+    """Compress the request body by the Content-Encoding, "gzip", "deflate" or "br"."""
+    if encoding == "gzip":
+        import gzip
+
+        return gzip.compress(data, mtime=0)  # same input, same output, so the cache key is stable
+    if encoding == "deflate":
+        return zlib.compress(data)
+    if encoding == "br":
+        if not brotli:
+            raise ModuleNotFoundError("Install brotli (`pip install brotli`) to use br encoding.")
+        return brotli.compress(data)
+    raise ValueError(f"invalid content encoding '{encoding}' (gzip/deflate/br)")
@@ -0,0 +1,256 @@
+import io
+import sys
+import time
+import threading
+import http.client
+import urllib.error
+import urllib.parse
+import urllib.request
+
+
+USER_AGENT = f"Python-urllib/{sys.version_info[0]}.{sys.version_info[1]}"  # same as `urllib.request.urlopen()`
+REDIRECT_CODES = (301, 302, 303, 307, 308)
+IDEMPOTENT_METHODS = ("GET", "HEAD", "OPTIONS", "TRACE", "PUT", "DELETE")  # safe to send again if the server may have processed it
+DEFAULT_HANDLERS = tuple(getattr(urllib.request, name) for name in ("ProxyHandler", "UnknownHandler", "HTTPHandler", "HTTPDefaultErrorHandler", "HTTPRedirectHandler", "FTPHandler", "FileHandler", "HTTPErrorProcessor", "DataHandler", "HTTPSHandler") if hasattr(urllib.request, name))  # the handlers of `urllib.request.build_opener()`
+RETRY_ERRORS = (http.client.RemoteDisconnected, http.client.BadStatusLine, ConnectionResetError, BrokenPipeError, ConnectionAbortedError)  # the reused connection was closed by the server
+
+
+class PooledResponse:
+    """The response of `ConnectionPool.request()`. The connection goes back to the pool once the body is read or the response is closed.
+
+    Attributes:
+        url (str): The final url after redirects.
+        status (int): The HTTP status code.
+        reason (str): The HTTP reason phrase.
+        headers (http.client.HTTPMessage): The response headers.
+    """
+
+    def __init__(self, pool: 'ConnectionPool', key: tuple, conn: http.client.HTTPConnection, response: http.client.HTTPResponse, url: str):
+        self._pool = pool
+        self._key = key
+        self._conn = conn
+        self._response = response
+        self.url = url
+        self.status = response.status
+        self.reason = response.reason
+        self.headers = response.headers
+
+    def __enter__(self) -> 'PooledResponse':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def getcode(self) -> int:
+        return self.status
+
+    def geturl(self) -> str:
+        return self.url
+
+    def read(self, amt: int | None = None) -> bytes:
+        """Read the body, or up to `amt` bytes of the body."""
+        if self._response is None:
+            return b""
+        data = self._response.read(amt)
+        if self._response.isclosed():  # the body is fully read
+            self.close()
+        return data
+
+    def close(self):
+        """Release the connection to the pool if the body is fully read, otherwise close the connection."""
+        if self._response is None:
+            return
+        response, self._response = self._response, None
+        if response.isclosed() and not response.will_close:
+            self._pool._release(self._key, self._conn)
+        else:
+            response.close()
+            self._conn.close()
+
+
+class ConnectionPool:
+    """Keep-alive HTTP connections reused per host.
+
+    Attributes:
+        max_per_host (int): Max idle connections kept for each host.
+        idle_timeout (float): Seconds an idle connection is kept.
+        timeout (float): Socket timeout in seconds. None means the global default.
+        max_redirects (int): Max redirects to follow.
+    """
+
+    def __init__(self, max_per_host: int = 4, idle_timeout: float = 60.0, timeout: float | None = None, max_redirects: int = 10, context=None):
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.timeout = timeout
+        self.max_redirects = max_redirects
+        self.context = context  # ssl.SSLContext for https
+        self._idle: dict = {}  # {(scheme, host, port): [(conn, last_used), ...]}
+        self._lock = threading.Lock()
+
+    def __enter__(self) -> 'ConnectionPool':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    @staticmethod
+    def _key(url: str) -> tuple:
+        parts = urllib.parse.urlsplit(url)
+        if parts.scheme not in ("http", "https"):
+            raise ValueError(f"unsupported url scheme '{parts.scheme}' (http/https)")
+        port = parts.port or (443 if parts.scheme == "https" else 80)
+        return (parts.scheme, parts.hostname, port)
+
+    def _connect(self, key: tuple) -> http.client.HTTPConnection:
+        scheme, host, port = key
+        timeout_kwargs = {} if self.timeout is None else {"timeout": self.timeout}
+        if scheme == "https":
+            return http.client.HTTPSConnection(host, port, context=self.context, **timeout_kwargs)
+        return http.client.HTTPConnection(host, port, **timeout_kwargs)
+
+    def _acquire(self, key: tuple) -> tuple[http.client.HTTPConnection, bool]:
+        """Get an idle connection of the host, or a new one. Returns `(conn, is_reused)`."""
+        now = time.monotonic()
+        with self._lock:
+            idles = self._idle.get(key, [])
+            while idles:
+                conn, last_used = idles.pop()
+                if now - last_used <= self.idle_timeout:
+                    return conn, True
+                conn.close()  # expired
+        return self._connect(key), False
+
+    def _release(self, key: tuple, conn: http.client.HTTPConnection):
+        with self._lock:
+            idles = self._idle.setdefault(key, [])
+            if len(idles) < self.max_per_host:
+                idles.append((conn, time.monotonic()))
+                return
+        conn.close()
+
+    def _send(self, method: str, url: str, body: bytes | None, headers: dict) -> PooledResponse:
+        key = self._key(url)
+        parts = urllib.parse.urlsplit(url)
+        path = urllib.parse.urlunsplit(("", "", parts.path or "/", parts.query, ""))
+        idempotent = method.upper() in IDEMPOTENT_METHODS
+        while True:
+            conn, is_reused = self._acquire(key)
+            if is_reused and not idempotent and _is_dropped(conn):  # can not be retried after sending, so check the idle connection first
+                conn.close()
+                continue
+            try:
+                conn.request(method, path, body=body, headers=headers)
+                response = conn.getresponse()
+            except RETRY_ERRORS:
+                conn.close()
+                if is_reused and idempotent:  # the idle connection was closed by the server, retry with a new one
+                    continue
+                raise
+            except BaseException:
+                conn.close()
+                raise
+            return PooledResponse(self, key, conn, response, url)
+
+    def request(self, method: str, url: str, body: bytes | None = None, headers: dict | None = None) -> PooledResponse:
+        """Send a request through a pooled connection, following redirects like `urllib.request.urlopen()`.
+
+        Args:
+            method (str): The HTTP method.
+            url (str): The full url.
+            body (bytes): The request body.
+            headers (dict): The request headers.
+
+        Returns:
+            PooledResponse: The response, should be read or closed to release the connection.
+
+        Raises:
+            urllib.error.HTTPError: The final response status is not 2xx.
+        """
+        headers = {key.title(): value for key, value in (headers or {}).items()}
+        headers.setdefault("User-Agent", USER_AGENT)
+        if body is not None:
+            headers.setdefault("Content-Type", "application/x-www-form-urlencoded")
+        for _ in range(self.max_redirects + 1):
+            response = self._send(method, url, body, headers)
+            if response.status in REDIRECT_CODES and response.headers.get("Location"):
+                response.read()  # drain the body to reuse the connection
+                url = urllib.parse.urljoin(url, response.headers["Location"])
+                if response.status in (301, 302, 303) and method != "HEAD":
+                    method, body = "GET", None
+                    headers.pop("Content-Type", None)
+                continue
+            if not 200 <= response.status < 300:  # same as `urllib.request.urlopen()`, 304 Not Modified raises too
+                content = response.read()
+                raise urllib.error.HTTPError(url, response.status, response.reason, response.headers, io.BytesIO(content))
+            return response
+        raise urllib.error.HTTPError(url, response.status, "Too many redirects", response.headers, None)
+
+    def urlopen(self, source) -> PooledResponse:
+        """Open a url or an `urllib.request.Request` like `urllib.request.urlopen()`."""
+        if isinstance(source, urllib.request.Request):
+            return self.request(source.get_method(), source.full_url, body=source.data, headers=dict(source.header_items()))
+        return self.request("GET", source)
+
+    def close(self):
+        """Close all the idle connections."""
+        with self._lock:
+            idles, self._idle = self._idle, {}
+        for conns in idles.values():
+            for conn, _last_used in conns:
+                conn.close()
+
+
+_default_pool = None
+_default_pool_lock = threading.Lock()
+
+
+def default_pool() -> ConnectionPool:
+    """Get the shared connection pool of `read_url()` and `ajax()`."""
+    global _default_pool
+    with _default_pool_lock:
+        if _default_pool is None:
+            _default_pool = ConnectionPool()
+        return _default_pool
+
+
+def is_poolable(source) -> bool:
+    """Check if the url can be opened by the pool: http/https, not through a proxy, and no custom opener is installed by `urllib.request.install_opener()`, whose handlers the pool would skip."""
+    if urllib.request._opener is not None and not _is_default_opener(urllib.request._opener):  # custom proxy, auth, cookie or ssl handlers
+        return False
+    url = source.full_url if isinstance(source, urllib.request.Request) else source
+    if not isinstance(url, str):
+        return False
+    parts = urllib.parse.urlsplit(url)
+    if parts.scheme not in ("http", "https"):
+        return False
+    proxies = urllib.request.getproxies()
+    if parts.scheme in proxies and not urllib.request.proxy_bypass(parts.hostname or ""):
+        return False
+    return True
+
+
+def _is_default_opener(opener: urllib.request.OpenerDirector) -> bool:
+    """Check if the opener works the same as the one `urllib.request.urlopen()` builds and keeps by itself on the first call."""
+    if opener.addheaders != [("User-agent", USER_AGENT)]:
+        return False
+    for handler in opener.handlers:
+        if type(handler) not in DEFAULT_HANDLERS:
+            return False
+        if isinstance(handler, urllib.request.ProxyHandler) and handler.proxies != urllib.request.getproxies():
+            return False
+        if isinstance(handler, urllib.request.HTTPSHandler) and (handler._context is not None or handler._check_hostname is not None):
+            return False
+    return True
+
+
+def _is_dropped(conn: http.client.HTTPConnection) -> bool:
+    """Check if the idle connection is closed by the server. An idle socket is readable only at EOF, or with unexpected data."""
+    import select
+
+    if conn.sock is None:
+        return True
+    try:
+        readable, _, _ = select.select([conn.sock], [], [], 0)
+    except (OSError, ValueError):
+        return True
+    return bool(readable)
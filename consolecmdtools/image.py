@@ -0,0 +1,58 @@
+import io
+
+
+def main_color(source: str, scale: int = 200, triplet: str = "rgb", is_url: bool = False) -> str | tuple[int, int, int] | None:
+    """Get a representative color from the source-pointed image
+
+    Imports:
+        colorsys: Shipped with python.
+        PIL: Use `pip install pillow` or install by package manager (apt, apk, etc).
+
+    Args:
+        source (str): The URL of the image, or the filepath.
+        scale (int): The size of generated image thumbnail.
+        triplet (str): The return value format. `rgb` for RGB triplet: (255, 255, 255), and `hex` for HEX triplet: '#FFFFFF'.
+        is_url (bool): The source should be downloaded or not.
+
+    Returns:
+        str: The main color of the source image in RGB or HEX format.
+    """
+    import colorsys
+    try:
+        from PIL import Image
+    except ModuleNotFoundError as e:
+        raise ModuleNotFoundError("Install pillow (`pip install pillow`) to use PIL.") from e
+
+    if not source:
+        return None
+    if is_url:
+        from .net import read_url
+
+        img_buffer = io.BytesIO(read_url(source))
+        img = Image.open(img_buffer).convert("RGBA")
+    else:  # source is an image file
+        img = Image.open(source).convert("RGBA")
+    img.thumbnail((scale, scale))
+    statistics: dict = {
+        "r": 0,
+        "g": 0,
+        "b": 0,
+        "coef": 0
+    }
+    for count, (r, g, b, a) in img.getcolors(img.size[0] * img.size[1]):  # get each color used in image with its count, maxcolors = the size of the image.
+        _h, s, _v = colorsys.rgb_to_hsv(r / 255, g / 255, b / 255)
+        saturation = s * 255  # extend the range from 0~1 to 0~255
+        coefficient: float = (saturation * count * a) or 0.01  # get how important this color is. Should not be 0.
+        statistics["r"] += coefficient * r  # raise the importance of red of this image.
+        statistics["g"] += coefficient * g
+        statistics["b"] += coefficient * b
+        statistics["coef"] += coefficient
+    color = (
+        int(statistics["r"] / statistics["coef"]),  # normalize to 0~255
+        int(statistics["g"] / statistics["coef"]),
+        int(statistics["b"] / statistics["coef"])
+    )
+    if triplet.lower() == "hex":
+        return "#%0.2X%0.2X%0.2X" % color
+    else:
+        return color
@@ -0,0 +1,226 @@
+import re
+import codecs
+import json
+import typing
+
+
+CHUNK_SIZE = 64 * 1024
+WHITESPACE = " \t\r\n"
+NUMBER_TAIL = re.compile(r"[0-9+\-.eE]*\Z")  # the rest of a number cut at the end of the buffer
+FORMATS = ("auto", "array", "ndjson")
+DETECT_SIZE = 1024 * 1024  # max bytes read to detect the format
+BACKENDS = ("auto", "json", "ijson", "orjson")
+
+
+def _read_chunks(stream, chunk_size: int) -> typing.Generator[bytes, None, None]:
+    while chunk := stream.read(chunk_size):
+        yield chunk
+
+
+def _detect_format(chunks: typing.Iterator[bytes], limit: int = DETECT_SIZE) -> tuple[str, typing.Iterator[bytes]]:
+    """Detect "array" or "ndjson" by the head of the stream, and get the chunks with the consumed ones put back.
+
+    A stream not starting with "[" is NDJSON. If it does, it is NDJSON only when its first line is a complete json value and more values follow, like `[1, 2]\\n[3, 4]`.
+    """
+    consumed = []
+    head = b""
+    for chunk in chunks:
+        consumed.append(chunk)
+        head += chunk
+        stripped = head.lstrip()
+        if not stripped:
+            continue
+        if stripped[:1] != b"[":
+            return "ndjson", _chain(consumed, chunks)
+        first_line, newline, rest = stripped.partition(b"\n")
+        if newline and rest.strip():
+            return ("ndjson" if _is_json(first_line) else "array"), _chain(consumed, chunks)
+        if len(head) >= limit:  # a huge first line, like a minified array
+            return "array", _chain(consumed, chunks)
+    stripped = head.lstrip()
+    return ("array" if stripped[:1] == b"[" else "ndjson"), iter(consumed)
+
+
+def _is_json(data: bytes) -> bool:
+    try:
+        json.loads(data)
+    except ValueError:
+        return False
+    return True
+
+
+def _chain(head: list, tail: typing.Iterator[bytes]) -> typing.Generator[bytes, None, None]:
+    yield from head
+    yield from tail
+
+
+def _iter_ndjson(chunks: typing.Iterator[bytes], loads: typing.Callable) -> typing.Generator[typing.Any, None, None]:
+    """Parse one json value per line."""
+    pending: list[bytes] = []  # the pieces of the last line, joined once its newline is read, so a long line is not copied for each chunk
+    for chunk in chunks:
+        lines = chunk.split(b"\n")
+        if len(lines) == 1:
+            pending.append(chunk)
+            continue
+        pending.append(lines[0])
+        lines[0] = b"".join(pending)
+        pending = [lines.pop()]
+        for line in lines:
+            if line.strip():
+                yield loads(line)
+    line = b"".join(pending)
+    if line.strip():
+        yield loads(line)
+
+
+def _iter_array(chunks: typing.Iterator[bytes]) -> typing.Generator[typing.Any, None, None]:
+    """Parse the items of a top-level json array one by one with `json.JSONDecoder.raw_decode()`."""
+    decoder = json.JSONDecoder()
+    text_decoder = codecs.getincrementaldecoder("utf-8")()
+    buffer = ""
+    pos = 0
+    eof = False
+    started = False
+    expect = "first"  # "first" for an item or "]" after "[", "item" after ",", "separator" for "," or "]" after an item
+
+    def fill() -> bool:
+        nonlocal buffer, pos, eof
+        chunk = next(chunks, None)
+        if chunk is None:
+            buffer = buffer[pos:] + text_decoder.decode(b"", final=True)
+            eof = True
+        else:
+            buffer = buffer[pos:] + text_decoder.decode(chunk)
+        pos = 0
+        return not eof
+
+    while True:
+        while pos < len(buffer) and buffer[pos] in WHITESPACE:
+            pos += 1
+        if pos == len(buffer):
+            if eof:
+                raise ValueError("unexpected end of json array")
+            fill()
+            continue
+        char = buffer[pos]
+        if not started:
+            if char != "[":
+                raise ValueError(f"expect a json array, got {char!r}")
+            started = True
+            pos += 1
+            continue
+        if char == "]":
+            if expect == "item":
+                raise ValueError("unexpected ']' after ',' in json array")
+            _check_end(buffer[pos + 1:], chunks, text_decoder)
+            return
+        if char == ",":
+            if expect != "separator":
+                raise ValueError("unexpected ',' in json array")
+            expect = "item"
+            pos += 1
+            continue
+        if expect == "separator":
+            raise ValueError(f"expect ',' or ']' in json array, got {char!r}")
+        try:
+            item, end = decoder.raw_decode(buffer, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            wanted = 2 * (len(buffer) - pos)  # the item is not complete yet, read as much again before retrying, so a huge item is parsed O(log n) times
+            while fill() and len(buffer) < wanted:
+                pass
+            continue
+        after = end
+        while after < len(buffer) and buffer[after] in WHITESPACE:
+            after += 1
+        if after == len(buffer) or buffer[after] not in ",]":
+            if not eof and (after == len(buffer) or NUMBER_TAIL.match(buffer, end)):  # a number may continue in the next chunk, like "12" + "3.4"
+                fill()
+                continue
+            if after < len(buffer):
+                raise ValueError(f"expect ',' or ']' in json array, got {buffer[after]!r}")
+        yield item
+        expect = "separator"
+        pos = end
+
+
+def _check_end(rest: str, chunks: typing.Iterator[bytes], text_decoder):
+    """Raise ValueError if anything but whitespace follows the closing bracket of the array."""
+    while True:
+        if rest.strip(WHITESPACE):
+            raise ValueError(f"unexpected data after the json array: {rest.strip(WHITESPACE)[:20]!r}")
+        chunk = next(chunks, None)
+        if chunk is None:
+            rest = text_decoder.decode(b"", final=True)
+            if rest.strip(WHITESPACE):
+                raise ValueError(f"unexpected data after the json array: {rest.strip(WHITESPACE)[:20]!r}")
+            return
+        rest = text_decoder.decode(chunk)
+
+
+def _iter_ijson(stream) -> typing.Generator[typing.Any, None, None]:
+    import ijson
+
+    try:
+        yield from ijson.items(stream, "item", use_float=True)
+    except ijson.JSONError as e:  # the same error type as the other backends
+        raise ValueError(str(e)) from e
+
+
+def iter_items(stream, format: str = "auto", backend: str = "auto", chunk_size: int = CHUNK_SIZE) -> typing.Generator[typing.Any, None, None]:
+    """Parse the json values from a binary stream incrementally, and yield them one by one.
+
+    Args:
+        stream (BinaryIO): A readable with `read(size)`, like a file opened in "rb" or a http response.
+        format (str): "array" for the items of a top-level json array, "ndjson" for one json value per line, or "auto" to detect by the head of the stream. Defaults to "auto".
+        backend (str): "json" for the standard library, "ijson" (array) or "orjson" (ndjson) if installed, or "auto" to use the faster one installed. Defaults to "auto".
+        chunk_size (int): Bytes to read in one go. Defaults to 64KB.
+
+    Yields:
+        Any: The parsed json values.
+    """
+    if format not in FORMATS:
+        raise ValueError(f"invalid json stream format '{format}' ({'/'.join(FORMATS)})")
+    if backend not in BACKENDS:
+        raise ValueError(f"invalid json backend '{backend}' ({'/'.join(BACKENDS)})")
+    chunks: typing.Iterator[bytes] = _read_chunks(stream, chunk_size)
+    if format == "auto":
+        format, chunks = _detect_format(chunks)
+    for name in ("ijson", "orjson"):
+        if backend == name and not _has_module(name):
+            raise ModuleNotFoundError(f"Install {name} (`pip install {name}`) to use {name} backend.")
+    if format == "array":
+        if backend == "ijson" or (backend == "auto" and _has_module("ijson")):
+            yield from _iter_ijson(_ChunksReader(chunks))
+        else:
+            yield from _iter_array(chunks)
+        return
+    loads = json.loads
+    if backend == "orjson" or (backend == "auto" and _has_module("orjson")):
+        import orjson
+
+        loads = orjson.loads
+    yield from _iter_ndjson(chunks, loads)
+
+
+class _ChunksReader:
+    """A binary reader over the chunks, so the peeked chunks can be read again."""
+
+    def __init__(self, chunks: typing.Iterator[bytes]):
+        self._chunks = chunks
+        self._pending = b""
+
+    def read(self, size: int = -1) -> bytes:
+        if not self._pending:
+            self._pending = next(self._chunks, b"")
+        if size < 0:
+            size = len(self._pending)
+        data, self._pending = self._pending[:size], self._pending[size:]
+        return data
+
+
+def _has_module(name: str) -> bool:
+    import importlib.util
+
+    return importlib.util.find_spec(name) is not None
@@ -0,0 +1,205 @@
+import os
+import array
+import itertools
+import typing
+
+
+class LineIndex:
+    """Random access to the lines of a huge text file by the offsets of newlines.
+
+    The file is memory-mapped, and the start offset of each line is kept in an `array('Q')`, 8 bytes per line.
+    The index is saved to a sidecar file, so it can be reused next time. If the file grows, only the new part is scanned.
+
+    Attributes:
+        path (str): The absolute path of the text file.
+        index_path (str): The sidecar file path of the index. None means the index is not saved.
+        encoding (str): The encoding to decode lines.
+        errors (str): The error handler to decode lines.
+
+    Examples:
+        index = LineIndex('/path/to/huge.log')
+        len(index)  # lines count
+        index[0]  # the first line
+        index[-10:]  # the last 10 lines
+        index.refresh()  # index the lines appended since last time
+    """
+    MAGIC = b"CCTLIDX1"
+    HEAD_SIZE = 4096  # bytes of the file head to check if the file is replaced
+    CHUNK_SIZE = 16 * 1024 * 1024  # bytes scanned in one go
+
+    def __init__(self, path: str, index_path: str | None = "", encoding: str = "utf-8", errors: str = "replace"):
+        """
+        Args:
+            path (str): The text file path.
+            index_path (str): The sidecar file to save the index. Defaults to "", in the user cache folder. None means do not save.
+            encoding (str): The encoding to decode lines. Defaults to "utf-8".
+            errors (str): The error handler to decode lines. Defaults to "replace".
+        """
+        self.path = os.path.abspath(os.path.expanduser(path))
+        if index_path == "":
+            import hashlib
+            from .fs import _cache_dir
+
+            index_path = os.path.join(_cache_dir("lineindex"), hashlib.sha1(self.path.encode()).hexdigest() + ".idx")
+        self.index_path = index_path
+        self.encoding = encoding
+        self.errors = errors
+        self.starts = array.array("Q", [0])  # the start offset of each line
+        self.indexed = 0  # bytes scanned
+        self._saved = 0  # offsets in the sidecar file
+        self._head_crc = 0
+        self._file = None
+        self._mmap = None
+        self._mapped_size = 0
+        self._load()
+        self.refresh()
+
+    def __repr__(self) -> str:
+        return f"LineIndex({self.path!r})"
+
+    def __enter__(self) -> 'LineIndex':
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+    def __len__(self) -> int:
+        if self.starts[-1] >= self.indexed:  # empty file, or ends with a newline
+            return len(self.starts) - 1
+        return len(self.starts)
+
+    def __getitem__(self, key: int | slice) -> str | list[str]:
+        if isinstance(key, slice):
+            return [self.line(n) for n in range(*key.indices(len(self)))]
+        return self.line(key)
+
+    def __iter__(self) -> typing.Iterator[str]:
+        for n in range(len(self)):
+            yield self.line(n)
+
+    def _head_checksum(self, size: int) -> int:
+        """Get the CRC32 of the first `size` bytes of the file, at most `HEAD_SIZE` bytes."""
+        import zlib
+
+        with open(self.path, "rb") as f:
+            return zlib.crc32(f.read(min(size, self.HEAD_SIZE)))
+
+    def _load(self):
+        """Load the saved index if it is still valid for the file."""
+        if not self.index_path or not os.path.isfile(self.index_path):
+            return
+        try:
+            with open(self.index_path, "rb") as f:
+                header = f.read(len(self.MAGIC) + 16)
+                if len(header) < len(self.MAGIC) + 16 or not header.startswith(self.MAGIC):
+                    return
+                indexed = int.from_bytes(header[len(self.MAGIC):len(self.MAGIC) + 8], "little")
+                head_crc = int.from_bytes(header[len(self.MAGIC) + 8:], "little")
+                starts = array.array("Q")
+                starts.frombytes(f.read())
+        except (OSError, ValueError):
+            return
+        if os.path.getsize(self.path) < indexed or head_crc != self._head_checksum(indexed):  # truncated or replaced
+            return
+        if not starts or starts[0] != 0:
+            return
+        while starts[-1] > indexed:  # appended by a save interrupted before the header was updated
+            starts.pop()
+        self.starts, self.indexed, self._head_crc = starts, indexed, head_crc
+        self._saved = len(starts)
+
+    def save(self):
+        """Save the index to the sidecar file. If the saved index is a prefix of this one, only the new offsets are appended, and the header is updated in place."""
+        if not self.index_path:
+            return
+        header_size = len(self.MAGIC) + 16
+        if 0 < self._saved <= len(self.starts) and os.path.isfile(self.index_path) and os.path.getsize(self.index_path) == header_size + self._saved * 8:
+            with open(self.index_path, "r+b") as f:
+                f.seek(0, os.SEEK_END)
+                self.starts[self._saved:].tofile(f)
+                f.flush()  # the offsets before the header, so an interrupted save is still valid to load
+                f.seek(len(self.MAGIC))
+                f.write(self.indexed.to_bytes(8, "little"))
+                f.write(self._head_crc.to_bytes(8, "little"))
+            self._saved = len(self.starts)
+            return
+        os.makedirs(os.path.dirname(self.index_path), exist_ok=True)
+        tmp_path = f"{self.index_path}.tmp{os.getpid()}"
+        with open(tmp_path, "wb") as f:
+            f.write(self.MAGIC)
+            f.write(self.indexed.to_bytes(8, "little"))
+            f.write(self._head_crc.to_bytes(8, "little"))
+            self.starts.tofile(f)
+        os.replace(tmp_path, self.index_path)
+        self._saved = len(self.starts)
+
+    def _remap(self, size: int):
+        import mmap
+
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is None:
+            self._file = open(self.path, "rb")
+        if size:  # empty file cannot be mapped
+            self._mmap = mmap.mmap(self._file.fileno(), size, access=mmap.ACCESS_READ)
+        self._mapped_size = size
+
+    def refresh(self) -> int:
+        """Index the lines appended to the file since last time. If the file is truncated or replaced, index it again.
+
+        Returns:
+            int: The lines count.
+        """
+        size = os.path.getsize(self.path)
+        if self.indexed and (size < self.indexed or self._head_checksum(self.indexed) != self._head_crc):  # truncated or replaced
+            self.starts, self.indexed = array.array("Q", [0]), 0
+            self._saved = 0  # save all again
+            self.close()  # reopen, the file may be a new one with the same path
+        if size == self.indexed:
+            return len(self)
+        if size != self._mapped_size or self._file is None:
+            self._remap(size)
+        offset = self.indexed
+        while offset < size:
+            end = min(offset + self.CHUNK_SIZE, size)
+            parts = self._mmap[offset:end].split(b"\n")
+            starts = itertools.accumulate((len(part) + 1 for part in parts[:-1]), initial=offset)
+            next(starts)  # skip the offset itself
+            self.starts.extend(starts)
+            offset = end
+        self.indexed = size
+        self._head_crc = self._head_checksum(size)
+        self.save()
+        return len(self)
+
+    def line_bytes(self, n: int) -> bytes:
+        """Get the raw bytes of line N without the newline. N starts from 0, and can be negative."""
+        count = len(self)
+        if n < 0:
+            n += count
+        if not 0 <= n < count:
+            raise IndexError("line index out of range")
+        if self._mmap is None:  # the index is loaded from the sidecar file, and the file is not mapped yet
+            self._remap(self.indexed)
+        start = self.starts[n]
+        end = self.starts[n + 1] - 1 if n + 1 < len(self.starts) else self.indexed
+        data = self._mmap[start:end]
+        return data[:-1] if data.endswith(b"\r") else data
+
+    def line(self, n: int) -> str:
+        """Get line N without the newline. N starts from 0, and can be negative."""
+        return self.line_bytes(n).decode(self.encoding, errors=self.errors)
+
+    def lines(self, start: int, stop: int | None = None) -> list[str]:
+        """Get the lines from `start` to `stop` (excluded), like `lines[start:stop]`."""
+        return self[start:stop]
+
+    def close(self):
+        """Close the memory map and the file."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
@@ -0,0 +1,238 @@
+import os
+import time
+import functools
+import threading
+
+
+CO_GENERATOR = 0x20  # flags of `func.__code__.co_flags`, same as `inspect.CO_GENERATOR`, without importing `inspect`
+CO_COROUTINE = 0x80
+MAX_SAMPLES = 10000  # latencies kept for the percentiles of each function, reservoir sampled beyond
+
+_hooks: list = []  # [hook(name: str, elapsed: float, nbytes: int | None, error: BaseException | None)]
+
+
+def add_hook(hook):
+    """Register a hook called after each call of the public helpers.
+
+    Args:
+        hook (callable): `hook(name: str, elapsed: float, nbytes: int | None, error: BaseException | None)`. The elapsed time is in seconds, the bytes processed is None if unknown.
+    """
+    if hook not in _hooks:
+        _hooks.append(hook)
+
+
+def remove_hook(hook):
+    """Unregister the hook, ignored if it is not registered."""
+    if hook in _hooks:
+        _hooks.remove(hook)
+
+
+def _file_size(path) -> int | None:
+    try:
+        return os.path.getsize(path)
+    except (OSError, TypeError, ValueError):
+        return None
+
+
+def _hash_bytes(args: tuple, kwargs: dict, result) -> int | None:
+    target = args[0] if args else kwargs.get("target")
+    if isinstance(target, (bytes, str)) and not kwargs.get("force_text") and os.path.isfile(target):
+        return _file_size(target)
+    return len(target) if isinstance(target, (bytes, str)) else None
+
+
+BYTES_COUNTERS = {  # {name: counter(args, kwargs, result) -> int | None}, the bytes processed by a call
+    "md5": _hash_bytes,
+    "crc32": _hash_bytes,
+    "copy_file": lambda args, kwargs, result: _file_size(result),
+    "move_file": lambda args, kwargs, result: _file_size(result),
+    "clone_file": lambda args, kwargs, result: _file_size(args[0] if args else kwargs.get("src")),
+    "download_file": lambda args, kwargs, result: _file_size(result),
+    "copy_files": lambda args, kwargs, result: result.get("bytes"),
+    "move_files": lambda args, kwargs, result: result.get("bytes"),
+}
+
+
+def _count_bytes(name: str, args: tuple, kwargs: dict, result) -> int | None:
+    counter = BYTES_COUNTERS.get(name)
+    if counter:
+        try:
+            return counter(args, kwargs, result)
+        except Exception:
+            return None
+    if isinstance(result, (bytes, str)):  # read_url, read_file, read_cmd, ...
+        return len(result)
+    return None
+
+
+def _emit(name: str, elapsed: float, nbytes: int | None, error: BaseException | None):
+    for hook in list(_hooks):
+        hook(name, elapsed, nbytes, error)
+
+
+def instrument(name: str, func):
+    """Wrap the function to call the hooks after each call. When no hook is registered, the overhead is one list check.
+
+    Generators are measured until they are exhausted or closed, and coroutines until they return.
+    """
+    flags = getattr(getattr(func, "__code__", None), "co_flags", 0)
+    if flags & CO_GENERATOR:
+        @functools.wraps(func)
+        def generator_wrapper(*args, **kwargs):
+            if not _hooks:
+                return (yield from func(*args, **kwargs))
+            start = time.perf_counter()
+            nbytes = 0
+            error = None
+            try:
+                for item in func(*args, **kwargs):
+                    if isinstance(item, (bytes, str)):
+                        nbytes += len(item)
+                    yield item
+            except BaseException as e:
+                error = e
+                raise
+            finally:
+                _emit(name, time.perf_counter() - start, nbytes or None, error if not isinstance(error, GeneratorExit) else None)
+        return generator_wrapper
+    if flags & CO_COROUTINE:
+        @functools.wraps(func)
+        async def coroutine_wrapper(*args, **kwargs):
+            if not _hooks:
+                return await func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                result = await func(*args, **kwargs)
+            except BaseException as e:
+                _emit(name, time.perf_counter() - start, None, e)
+                raise
+            _emit(name, time.perf_counter() - start, _count_bytes(name, args, kwargs, result), None)
+            return result
+        return coroutine_wrapper
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not _hooks:
+            return func(*args, **kwargs)
+        start = time.perf_counter()
+        try:
+            result = func(*args, **kwargs)
+        except BaseException as e:
+            _emit(name, time.perf_counter() - start, None, e)
+            raise
+        _emit(name, time.perf_counter() - start, _count_bytes(name, args, kwargs, result), None)
+        return result
+    return wrapper
+
+
+class Recorder:
+    """A hook records the call counts, latencies and bytes processed of each function.
+
+    Attributes:
+        stats (dict): `{name: {"calls": int, "errors": int, "total": float, "bytes": int, "samples": list}}`.
+    """
+
+    def __init__(self, max_samples: int = MAX_SAMPLES):
+        self.max_samples = max_samples
+        self.stats: dict = {}
+        self._lock = threading.Lock()
+        self._random = None
+
+    def __call__(self, name: str, elapsed: float, nbytes: int | None, error: BaseException | None):
+        with self._lock:
+            stat = self.stats.get(name)
+            if stat is None:
+                stat = self.stats[name] = {"calls": 0, "errors": 0, "total": 0.0, "bytes": 0, "samples": []}
+            stat["calls"] += 1
+            stat["errors"] += error is not None
+            stat["total"] += elapsed
+            stat["bytes"] += nbytes or 0
+            if len(stat["samples"]) < self.max_samples:
+                stat["samples"].append(elapsed)
+            else:  # reservoir sampling, every call has the same chance to be kept
+                if self._random is None:
+                    import random
+
+                    self._random = random.Random(0)
+                index = self._random.randrange(stat["calls"])
+                if index < self.max_samples:
+                    stat["samples"][index] = elapsed
+
+    def reset(self):
+        with self._lock:
+            self.stats = {}
+
+    def report(self) -> dict:
+        """Summarize the stats.
+
+        Returns:
+            dict: `{name: {"calls", "errors", "total", "mean", "p50", "p90", "p99", "max", "bytes"}}`, sorted by the total time, in seconds.
+        """
+        with self._lock:
+            stats = {name: dict(stat, samples=sorted(stat["samples"])) for name, stat in self.stats.items()}
+        report = {}
+        for name, stat in sorted(stats.items(), key=lambda item: item[1]["total"], reverse=True):
+            samples = stat["samples"]
+            report[name] = {
+                "calls": stat["calls"],
+                "errors": stat["errors"],
+                "total": stat["total"],
+                "mean": stat["total"] / stat["calls"],
+                "p50": _percentile(samples, 0.5),
+                "p90": _percentile(samples, 0.9),
+                "p99": _percentile(samples, 0.99),
+                "max": samples[-1],
+                "bytes": stat["bytes"],
+            }
+        return report
+
+
+def _percentile(ordered: list, ratio: float) -> float:
+    return ordered[min(int(len(ordered) * ratio), len(ordered) - 1)]
+
+
+_recorder = Recorder()
+
+
+def enable():
+    """Start recording the metrics of the public helpers."""
+    add_hook(_recorder)
+
+
+def disable():
+    """Stop recording. The recorded metrics are kept."""
+    remove_hook(_recorder)
+
+
+def reset():
+    """Clear the recorded metrics."""
+    _recorder.reset()
+
+
+def report() -> dict:
+    """Get the recorded metrics. See `Recorder.report()`."""
+    return _recorder.report()
+
+
+def to_json(indent: int | None = 2) -> str:
+    """Get the recorded metrics as JSON."""
+    import json
+
+    return json.dumps(report(), indent=indent)
+
+
+def print_table(title: str = "consolecmdtools metrics"):
+    """Print the recorded metrics as a table."""
+    import consoleiotools as cit
+    from rich.table import Table
+
+    table = Table(title=title)
+    for column in ("Function", "Calls", "Errors", "Total", "Mean", "P50", "P90", "P99", "Bytes"):
+        table.add_column(column, justify="left" if column == "Function" else "right")
+    for name, stat in report().items():
+        table.add_row(
+            name, str(stat["calls"]), str(stat["errors"]),
+            *(f"{stat[key] * 1000:.3f}ms" for key in ("total", "mean", "p50", "p90", "p99")),
+            str(stat["bytes"]),
+        )
+    cit.print(table)
@@ -0,0 +1,463 @@
+import os
+import urllib.request
+import urllib.parse
+import json
+import typing
+import shutil
+# !! some imports are lazy-loaded
+
+import consoleiotools as cit
+
+from .fs import _cache_dir, _load_json, _save_json
+
+
+def _request_with_headers(url, headers: dict) -> urllib.request.Request:
+    """Make a new request of the url with additional headers, the original request is not changed."""
+    if isinstance(url, urllib.request.Request):
+        req = urllib.request.Request(url.full_url, data=url.data, headers=dict(url.header_items()), method=url.get_method())
+    else:
+        req = urllib.request.Request(url)
+    for key, value in headers.items():
+        req.add_header(key, value)
+    return req
+
+
+def _check_update(filename: str, url, metas: dict) -> dict:
+    """Fetch the remote file with conditional headers, and compare it with the local file.
+
+    Args:
+        filename (str): Local filename.
+        url (str|urllib.request.Request): Remote url of raw file content.
+        metas (dict): The saved validators of files, `{abs_filename: {"url": ..., "etag": ..., "last_modified": ..., "digest": ...}}`.
+
+    Returns:
+        dict: {"status": "same"|"new"|"empty", "content": bytes, "diff": int, "meta": dict}. The status is "same" if the remote returns 304 Not Modified.
+    """
+    import hashlib
+    import urllib.error
+
+    with open(filename, "rb") as f:
+        current_codes = f.read().replace(b"\r", b"")
+    url_key = url.full_url if isinstance(url, urllib.request.Request) else url
+    meta = metas.get(os.path.abspath(filename)) or {}
+    headers = {}
+    if meta.get("url") == url_key and meta.get("digest") == hashlib.sha256(current_codes).hexdigest():  # the local file is the one validated last time
+        if meta.get("etag"):
+            headers["If-None-Match"] = meta["etag"]
+        if meta.get("last_modified"):
+            headers["If-Modified-Since"] = meta["last_modified"]
+    try:
+        with _urlopen(_request_with_headers(url, headers)) as response:
+            raw_codes = response.read()
+            etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+    except urllib.error.HTTPError as e:
+        if e.code == 304 and headers:  # Not Modified, no body transferred
+            return {"status": "same", "content": None, "diff": 0, "meta": meta}
+        raise
+    if not raw_codes:
+        return {"status": "empty", "content": raw_codes, "diff": 0, "meta": {}}
+    new_meta = {"url": url_key, "etag": etag, "last_modified": last_modified, "digest": hashlib.sha256(raw_codes).hexdigest()}
+    return {
+        "status": "same" if current_codes == raw_codes else "new",
+        "content": raw_codes,
+        "diff": len(raw_codes) - len(current_codes),
+        "meta": new_meta,
+    }
+
+
+def update_file(filename: str, url: str, revalidate: bool = True, cache_dir: str | None = None) -> bool:
+    """Check and update file compares with remote_url
+
+    Args:
+        filename (str): Local filename, normally it's `__file__`
+        url (str|urllib.request.Request): Remote url of raw file content. Use urllib.request.Request object for headers.
+        revalidate (bool): Save the ETag/Last-Modified of the remote file, and send `If-None-Match`/`If-Modified-Since` next time, so an unchanged remote file is not downloaded again. Defaults to True.
+        cache_dir (str): The folder to save the validators. Defaults to None, the user cache folder like `~/.cache/consolecmdtools`.
+    Returns:
+        bool: File updated or not
+    """
+    if not url or not filename:
+        return False
+    meta_path = os.path.join(cache_dir or _cache_dir(), "update_file.json")
+    metas = _load_json(meta_path) if revalidate else {}
+    try:
+        result = _check_update(filename, url, metas)
+        if result["status"] == "empty":
+            cit.err("Failed to get remote file content.")
+            return False
+        key = os.path.abspath(filename)
+        if result["status"] == "same":
+            cit.info("{} is already up-to-date.".format(filename))
+            is_updated = False
+            metas[key] = result["meta"]
+        else:
+            cit.ask("A new version is available. Update? (Diff: {})".format(result["diff"]))
+            if cit.get_choice(["Yes", "No"]) == "Yes":
+                with open(filename, "wb") as f:
+                    f.write(result["content"])
+                cit.info("Update Success.")
+                is_updated = True
+                metas[key] = result["meta"]
+            else:
+                cit.warn("Update Canceled")
+                is_updated = False
+                metas.pop(key, None)  # the local file is not validated, fetch the whole file next time
+        if revalidate:
+            _save_json(meta_path, metas)
+        return is_updated
+    except Exception as e:
+        cit.err("{f} update failed: {e}".format(f=filename, e=e))
+        return False
+
+
+def update_files(pairs: typing.Iterable[tuple], max_concurrency: int = 8, revalidate: bool = True, cache_dir: str | None = None) -> dict:
+    """Check and update many files compares with their remote urls concurrently.
+
+    All the remote files are fetched and compared on a thread pool, then the confirmation is asked once for the whole batch.
+    The new contents are written to temporary files first, and then replace the local files, so a failed write leaves no file half updated.
+
+    Args:
+        pairs (Iterable[tuple]): The `(filename, url)` pairs. See `update_file()`.
+        max_concurrency (int): The max number of concurrent fetches. Defaults to 8.
+        revalidate (bool): Use ETag/Last-Modified to skip the unchanged remote files. Defaults to True.
+        cache_dir (str): The folder to save the validators. Defaults to None, the user cache folder.
+
+    Returns:
+        dict: `{filename: bool}`, the file is updated or not.
+    """
+    import concurrent.futures
+    import tempfile
+
+    pairs = [(filename, url) for filename, url in pairs if filename and url]
+    results = {filename: False for filename, _url in pairs}
+    if not pairs:
+        return results
+    meta_path = os.path.join(cache_dir or _cache_dir(), "update_file.json")
+    metas = _load_json(meta_path) if revalidate else {}
+    news = []  # [(filename, result)]
+    with concurrent.futures.ThreadPoolExecutor(max_workers=max(max_concurrency, 1)) as pool:
+        futures = [(filename, pool.submit(_check_update, filename, url, metas)) for filename, url in pairs]
+        for filename, future in futures:
+            try:
+                result = future.result()
+            except Exception as e:
+                cit.err("{f} update failed: {e}".format(f=filename, e=e))
+                continue
+            if result["status"] == "empty":
+                cit.err("{}: Failed to get remote file content.".format(filename))
+            elif result["status"] == "same":
+                cit.info("{} is already up-to-date.".format(filename))
+                metas[os.path.abspath(filename)] = result["meta"]
+            else:
+                news.append((filename, result))
+    if news:
+        for filename, result in news:
+            cit.echo("{} (Diff: {})".format(filename, result["diff"]), pre="new")
+        cit.ask("{} new versions are available. Update all?".format(len(news)))
+        if cit.get_choice(["Yes", "No"]) == "Yes":
+            tmp_paths = []
+            try:
+                for filename, result in news:  # write all the new contents before replacing any file
+                    fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(os.path.abspath(filename)), prefix=".tmp-")
+                    tmp_paths.append(tmp_path)
+                    with os.fdopen(fd, "wb") as f:
+                        f.write(result["content"])
+                    shutil.copymode(filename, tmp_path)
+                for (filename, result), tmp_path in zip(news, tmp_paths):
+                    os.replace(tmp_path, filename)
+                    results[filename] = True
+                    metas[os.path.abspath(filename)] = result["meta"]
+                cit.info("Update Success.")
+            except OSError as e:
+                for tmp_path in tmp_paths:
+                    if os.path.exists(tmp_path):
+                        os.remove(tmp_path)
+                cit.err("Update failed: {}".format(e))
+        else:
+            cit.warn("Update Canceled")
+            for filename, _result in news:
+                metas.pop(os.path.abspath(filename), None)
+    if revalidate:
+        _save_json(meta_path, metas)
+    return results
+
+
+def _urlopen(source, pool=None, accept_encoding: bool = True):
+    """Open the url through the connection pool if possible, otherwise through `urllib.request.urlopen()`.
+
+    Args:
+        source (str|Request): The target url.
+        pool (ConnectionPool|bool): The connection pool. None or True for the shared pool, False for `urllib.request.urlopen()`.
+        accept_encoding (bool): Ask for a compressed response, and decompress it as it is read. Skipped if the request has its own `Accept-Encoding`. Defaults to True.
+
+    Returns:
+        PooledResponse|DecodedResponse|http.client.HTTPResponse: The response, use it with `with` to release the connection.
+    """
+    from . import httppool, httpcodec
+
+    decode = accept_encoding and not (isinstance(source, urllib.request.Request) and source.has_header("Accept-encoding"))
+    if decode:
+        source = _request_with_headers(source, {"Accept-Encoding": httpcodec.ACCEPT_ENCODING})
+    if pool is not False and httppool.is_poolable(source):
+        if not isinstance(pool, httppool.ConnectionPool):
+            pool = httppool.default_pool()
+        response = pool.urlopen(source)
+    else:
+        response = urllib.request.urlopen(source)
+    return httpcodec.decode(response) if decode else response
+
+
+def read_url(source, pool=None, cache=None) -> bytes:
+    """Try to get file content from the url
+
+    Args:
+        source (str|Request): The target url.
+        pool (ConnectionPool|bool): Reuse keep-alive connections from this pool. Defaults to None, the shared pool is used for http/https urls not through a proxy, unless an opener is installed by `urllib.request.install_opener()`. False to open a new connection every time.
+        cache (ResponseCache|bool): Get the response from this on-disk cache if it is fresh. True for the shared cache in the user cache folder. Defaults to None, no cache.
+
+    Returns:
+        bytes: The content of the request's response.
+    """
+    if cache:
+        from . import httpcache
+
+        if not isinstance(cache, httpcache.ResponseCache):
+            cache = httpcache.default_cache()
+        return cache.fetch(source, lambda req: _urlopen(req, pool=pool))
+    with _urlopen(source, pool=pool) as response:
+        return response.read() if response else b""
+
+
+def _content_range(value: str | None) -> tuple[int | None, int | None]:
+    """Parse `Content-Range: bytes start-end/total` into `(start, total)`. The total is None if it is unknown."""
+    unit, _, spec = (value or "").partition(" ")
+    if unit != "bytes" or "/" not in spec:
+        return None, None
+    span, _, total = spec.partition("/")
+    start = span.partition("-")[0]
+    return (int(start) if start.isdigit() else None), (int(total) if total.isdigit() else None)
+
+
+def download_file(url, dst: str, progress: typing.Callable | None = None, digest: str | None = None, chunk_size: int = 1024 * 1024, retries: int = 3, pool=None) -> str:
+    """Download the url to a file in chunks, and resume the interrupted download by HTTP Range requests.
+
+    The content is written to `<dst>.part` first, and renamed to `dst` after it is complete and verified, so `dst` is never half written.
+    The ETag/Last-Modified of the partial download is saved in `<dst>.part.json`, so the download is resumed only if the remote file is not changed.
+
+    Args:
+        url (str|Request): The target url.
+        dst (str): The destination file path.
+        progress (callable): `progress(downloaded: int, total: int | None)` is called after each chunk. The total is None if the size is unknown.
+        digest (str): Verify the content by the hash, like "sha256:<hexdigest>". A hexdigest without the algorithm is sha256.
+        chunk_size (int): Bytes to read and write in one go. Defaults to 1MB.
+        retries (int): Times to resume after the connection is broken. Defaults to 3.
+        pool (ConnectionPool|bool): Reuse keep-alive connections from this pool. See `read_url()`.
+
+    Returns:
+        str: The destination file path.
+
+    Raises:
+        urllib.error.HTTPError: The server responds an error.
+        ValueError: The content does not match the digest.
+    """
+    import hashlib
+    import http.client
+    import urllib.error
+
+    algorithm, _, expected = (digest or "").rpartition(":")
+    hasher = hashlib.new(algorithm or "sha256") if digest else None
+    dst = os.path.abspath(os.path.expanduser(dst))
+    part_path, meta_path = dst + ".part", dst + ".part.json"
+    os.makedirs(os.path.dirname(dst), exist_ok=True)
+    meta = _load_json(meta_path) if os.path.isfile(part_path) else {}
+    url_key = url.full_url if isinstance(url, urllib.request.Request) else url
+    if meta.get("url") != url_key or not (meta.get("etag") or meta.get("last_modified")):  # cannot tell if the remote file is changed, start over
+        meta = {}
+    offset = os.path.getsize(part_path) if meta else 0
+    total = meta.get("total")
+    attempt = 0
+    while True:
+        headers = {}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+            headers["If-Range"] = meta.get("etag") or meta["last_modified"]
+        try:
+            with _urlopen(_request_with_headers(url, headers), pool=pool, accept_encoding=False) as response:  # ranges of a compressed response cannot be joined
+                start, range_total = _content_range(response.headers.get("Content-Range"))
+                if response.status == 206 and start == offset:  # resumed
+                    mode = "ab"
+                    total = range_total
+                else:  # the whole content
+                    offset, mode = 0, "wb"
+                    length = response.headers.get("Content-Length")
+                    total = int(length) if length and length.isdigit() else None
+                meta = {"url": url_key, "etag": response.headers.get("ETag"), "last_modified": response.headers.get("Last-Modified"), "total": total}
+                _save_json(meta_path, meta)
+                with open(part_path, mode) as f:
+                    while chunk := response.read(chunk_size):
+                        f.write(chunk)
+                        offset += len(chunk)
+                        if progress:
+                            progress(offset, total)
+            if total is not None and offset < total:
+                raise http.client.IncompleteRead(b"", total - offset)
+            break
+        except urllib.error.HTTPError as e:
+            if e.code == 416 and offset:  # Range Not Satisfiable, the partial download may be complete already
+                _start, range_total = _content_range(e.headers.get("Content-Range"))
+                if range_total == offset:
+                    break
+                offset = 0
+                meta = {}
+                continue
+            raise
+        except (OSError, http.client.HTTPException):
+            attempt += 1
+            if attempt > retries or not os.path.isfile(part_path):
+                raise
+            offset = os.path.getsize(part_path) if meta.get("etag") or meta.get("last_modified") else 0  # resume from what is written
+    if hasher:
+        with open(part_path, "rb") as f:
+            while chunk := f.read(chunk_size):
+                hasher.update(chunk)
+        if hasher.hexdigest() != expected.lower():
+            os.remove(part_path)
+            os.remove(meta_path)
+            raise ValueError(f"digest mismatch: expected {expected}, got {hasher.hexdigest()}")
+    os.replace(part_path, dst)
+    os.remove(meta_path)
+    return dst
+
+
+def _open_first_accepted(reqs: list, opener: typing.Callable):
+    """Call `opener(req)` with the requests in order, until one is not rejected by 415 Unsupported Media Type."""
+    from urllib.error import HTTPError
+
+    for req in reqs[:-1]:
+        try:
+            return opener(req)
+        except HTTPError as e:
+            if e.code != 415:
+                raise
+    return opener(reqs[-1])
+
+
+def _iter_json_response(reqs: list, pool, format: str, backend: str) -> typing.Generator[typing.Any, None, None]:
+    from . import jsonstream
+
+    with _open_first_accepted(reqs, lambda req: _urlopen(req, pool=pool)) as response:
+        yield from jsonstream.iter_items(response, format=format, backend=backend)
+
+
+def ajax(url: str, param: dict = {}, method: str = "get", pool=None, cache=None, compress: bool | str = False, stream: bool | str = False, backend: str = "auto"):
+    """Get response using AJAX.
+
+    Args:
+        url (str): The requesting url.
+        param (dict): The parameters in the request payload.
+        method (str): The method of request, "get" or "post".
+        pool (ConnectionPool|bool): Reuse keep-alive connections from this pool. See `read_url()`.
+        cache (ResponseCache|bool): Get the response from this on-disk cache if it is fresh. See `read_url()`.
+        compress (bool|str): Compress the post payload, True or "gzip", "deflate", "br". The payload is sent again uncompressed if the server responds 415 Unsupported Media Type. Defaults to False.
+        stream (bool|str): Parse the response incrementally and return a generator of the items, "array" for the items of a top-level json array, "ndjson" for one json per line, or True to detect by the head of the response, which may take NDJSON of single-line arrays as an array. The cache is not used. Defaults to False.
+        backend (str): The json parser of the stream, "json", "ijson", "orjson", or "auto" to use the faster one installed. Defaults to "auto".
+    Returns:
+        dict: The responsed json decoded into a dict.
+        Generator: The parsed items one by one, if `stream` is set.
+    """
+    if method.lower() == "get":
+        if param:
+            param_enc = urllib.parse.urlencode(param)
+            url += "?" + param_enc
+        req = urllib.request.Request(url)
+    elif method.lower() == "post":
+        param_enc = json.dumps(param).encode("utf-8")
+        req = urllib.request.Request(url, data=param_enc)
+    else:
+        raise Exception("invalid method '{}' (GET/POST)".format(method))
+    reqs = [req]
+    if compress and req.data:
+        from . import httpcodec
+
+        encoding = "gzip" if compress is True else compress
+        reqs.insert(0, urllib.request.Request(url, data=httpcodec.compress(req.data, encoding), headers={"Content-Encoding": encoding}))
+    if stream:
+        return _iter_json_response(reqs, pool, "auto" if stream is True else stream, backend)
+    rsp_bytes = _open_first_accepted(reqs, lambda req: read_url(req, pool=pool, cache=cache))
+    if rsp_bytes:
+        rsp_str = rsp_bytes.decode("utf-8")
+        try:
+            return json.loads(rsp_str)
+        except json.decoder.JSONDecodeError:
+            return rsp_str
+    return None
+
+
+async def read_url_async(source, pool=None, executor=None) -> bytes:
+    """The awaitable version of `read_url()`. The request runs in the executor, so the event loop is not blocked.
+
+    Args:
+        source (str|Request): The target url.
+        pool (ConnectionPool|bool): Reuse keep-alive connections from this pool. See `read_url()`.
+        executor (concurrent.futures.Executor): The executor to run the request. Defaults to None, the default executor of the event loop.
+
+    Returns:
+        bytes: The content of the request's response.
+    """
+    import asyncio
+
+    return await asyncio.get_running_loop().run_in_executor(executor, lambda: read_url(source, pool=pool))
+
+
+async def ajax_async(url: str, param: dict = {}, method: str = "get", pool=None, executor=None):
+    """The awaitable version of `ajax()`. Same args as `ajax()`, and `executor` as `read_url_async()`."""
+    import asyncio
+
+    return await asyncio.get_running_loop().run_in_executor(executor, lambda: ajax(url, param=param, method=method, pool=pool))
+
+
+def fetch_many(urls: typing.Iterable, concurrency: int = 8, pool=None) -> typing.Generator[dict, None, None]:
+    """Fetch many urls concurrently, and yield the responses as they complete.
+
+    An error of one url is reported in its result, and does not stop the others.
+    The urls are read as the requests complete, with up to `concurrency * 4` in flight, so a long or endless iterable is streamed.
+
+    Args:
+        urls (Iterable[str|Request]): The target urls.
+        concurrency (int): The max number of requests in flight. Defaults to 8.
+        pool (ConnectionPool): Reuse keep-alive connections from this pool. Defaults to None, a new pool keeps up to `concurrency` connections per host.
+
+    Yields:
+        dict: {"url": str|Request, "content": bytes|None, "error": Exception|None}.
+    """
+    import concurrent.futures
+    from .httppool import ConnectionPool
+
+    own_pool = pool is None
+    if own_pool:
+        pool = ConnectionPool(max_per_host=concurrency)
+    try:
+        with concurrent.futures.ThreadPoolExecutor(max_workers=max(concurrency, 1)) as executor:
+            futures: dict = {}
+
+            def results(done) -> typing.Generator[dict, None, None]:
+                for future in done:
+                    url = futures.pop(future)
+                    try:
+                        yield {"url": url, "content": future.result(), "error": None}
+                    except Exception as e:
+                        yield {"url": url, "content": None, "error": e}
+
+            try:
+                for url in urls:
+                    futures[executor.submit(read_url, url, pool=pool)] = url
+                    if len(futures) >= max(concurrency, 1) * 4:
+                        done, _ = concurrent.futures.wait(futures, return_when=concurrent.futures.FIRST_COMPLETED)
+                        yield from results(done)
+                yield from results(concurrent.futures.as_completed(list(futures)))
+            finally:  # the generator is closed early
+                for future in futures:
+                    future.cancel()
+    finally:
+        if own_pool:
+            pool.close()
@@ -89,3 +89,15 @@ class Path(str):
     def is_file(self) -> bool:
         """Returns whether the path is a file."""
         return os.path.isfile(self.abs)
+
+
+def get_path(filepath: str) -> Path:
+    """Get file or parent dir absolute path or basename or extension.
+
+    Args:
+        filepath (str): The file path. Normally it's `__file__`.
+
+    Returns:
+        Path: The path object can be used like str.
+    """
+    return Path(filepath)
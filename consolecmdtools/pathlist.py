@@ -0,0 +1,176 @@
+import os
+import array
+import typing
+
+
+SEPS = tuple(sep for sep in (os.sep, os.altsep) if sep)
+
+
+def _split(path: str) -> list[str]:
+    """Split the path into the anchor (drive and leading separators) and the names, so joining them back gives the same string."""
+    drive, rest = os.path.splitdrive(path)
+    stripped = rest.lstrip(os.sep)
+    anchor = drive + rest[:len(rest) - len(stripped)]
+    names = stripped.split(os.sep) if stripped else []
+    if anchor:
+        return [anchor] + names
+    return names or [""]
+
+
+class PathList:
+    """A compact list of paths, stored as (parent id, name) nodes in arrays instead of full strings.
+
+    The shared folders of the paths are stored once, and the names are utf-8 bytes in one buffer, about 20 bytes per path plus the name.
+    The paths are joined back on access, so it iterates and indexes like a `list[str]`.
+
+    Attributes:
+        parents (array): The parent node id of each node, -1 for a top node.
+        offsets (array): The start offset of the name of each node in `names`, and the end of the last name.
+        names (bytearray): The names of all nodes.
+        entries (array): The node id of each path in the list.
+
+    Examples:
+        paths = PathList(['/root/a', '/root/a/b'])
+        paths.append('/root/a/c')
+        len(paths)  # 3
+        paths[-1]  # '/root/a/c'
+        list(paths.startswith('/root/a/'))  # ['/root/a/b', '/root/a/c']
+
+        # fill by a walker without building the full strings
+        top = paths.add('/root/d')
+        paths.add('e', parent=top)  # '/root/d/e'
+    """
+
+    def __init__(self, paths: typing.Iterable[str] = ()):
+        self.parents = array.array("i")
+        self.offsets = array.array("q", [0])
+        self.names = bytearray()
+        self.entries = array.array("i")
+        self._chain: list[tuple[str, int]] = []  # (name, node id) of the last appended path, to share its folders with the next one
+        self.extend(paths)
+
+    def __repr__(self) -> str:
+        return f"PathList({len(self)} paths)"
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __getitem__(self, key: int | slice) -> str | list[str]:
+        if isinstance(key, slice):
+            return [self.path(node) for node in self.entries[key]]
+        return self.path(self.entries[key])
+
+    def __iter__(self) -> typing.Iterator[str]:
+        cache: dict = {}  # {node id: path} of the recent folders, the paths in a folder are mostly next to each other
+        for node in self.entries:
+            yield self.path(node, cache)
+
+    def __sizeof__(self) -> int:
+        return object.__sizeof__(self) + sum(buffer.__sizeof__() for buffer in (self.parents, self.offsets, self.names, self.entries))
+
+    def add(self, name: str, parent: int = -1, entry: bool = True) -> int:
+        """Add a node under the parent node.
+
+        Args:
+            name (str): The name of the node, or the full path of a top node.
+            parent (int): The parent node id returned by `add()`. Defaults to -1, a top node.
+            entry (bool): Add the path of the node to the list. False for a folder only used as a parent. Defaults to True.
+
+        Returns:
+            int: The node id.
+        """
+        node = len(self.parents)
+        self.parents.append(parent)
+        self.names += name.encode("utf-8", "surrogatepass")
+        self.offsets.append(len(self.names))
+        if entry:
+            self.entries.append(node)
+        return node
+
+    def append(self, path: str):
+        """Add the path to the list. The folders shared with the previous path are stored once, so sorted or walked paths are compressed the best."""
+        path = os.fspath(path)
+        names = _split(path)
+        chain = self._chain
+        shared = 0
+        while shared < len(names) and shared < len(chain) and chain[shared][0] == names[shared]:
+            shared += 1
+        del chain[shared:]
+        if shared == len(names):  # the path is the same as a folder of the previous path
+            self.entries.append(chain[-1][1])
+            return
+        parent = chain[-1][1] if chain else -1
+        for index in range(shared, len(names)):
+            parent = self.add(names[index], parent, entry=index == len(names) - 1)
+            chain.append((names[index], parent))
+
+    def extend(self, paths: typing.Iterable[str]):
+        for path in paths:
+            self.append(path)
+
+    def name(self, node: int) -> str:
+        return self.names[self.offsets[node]:self.offsets[node + 1]].decode("utf-8", "surrogatepass")
+
+    def _segment(self, node: int) -> str:
+        """Get the name with the separator before it, as it is joined to the path of the parent."""
+        name = self.name(node)
+        parent = self.parents[node]
+        if parent < 0:
+            return name
+        if self.parents[parent] < 0 and self.name(parent).endswith(SEPS):  # the parent is an anchor like "/" or "C:\\"
+            return name
+        return os.sep + name
+
+    def path(self, node: int, cache: dict | None = None) -> str:
+        """Get the full path of the node.
+
+        Args:
+            node (int): The node id.
+            cache (dict): The paths of the folders joined before, `{node id: path}`, reused and updated. Defaults to None, no cache.
+        """
+        chain = []
+        parent = node
+        path = ""
+        while parent >= 0:
+            if cache is not None and parent in cache:
+                path = cache[parent]
+                break
+            chain.append(parent)
+            parent = self.parents[parent]
+        for ancestor in reversed(chain):
+            path += self._segment(ancestor)
+            if cache is not None and ancestor != node:
+                if len(cache) >= 4096:
+                    cache.clear()
+                cache[ancestor] = path
+        return path
+
+    def startswith(self, prefix: str) -> typing.Generator[str, None, None]:
+        """Yield the paths starting with the prefix, same as `(path for path in paths if path.startswith(prefix))`, but only the names along the prefix are compared.
+
+        Args:
+            prefix (str): The prefix of the paths, like "/root/a/" for the paths in the folder, or "/root/a" for the folder itself as well.
+        """
+        matched = bytearray(len(self.parents))  # 1 if the path of the node starts with the prefix
+        partial = {}  # {node id: length of the prefix matched by the path of the node}
+        for node, parent in enumerate(self.parents):
+            if parent >= 0 and matched[parent]:
+                matched[node] = 1
+                continue
+            if parent < 0:
+                done = 0
+            elif parent in partial:
+                done = partial[parent]
+            else:
+                continue
+            segment = self._segment(node)
+            rest = prefix[done:]
+            if len(segment) >= len(rest):
+                matched[node] = segment.startswith(rest)
+            elif rest.startswith(segment):
+                partial[node] = done + len(segment)
+        cache: dict = {}
+        for node in self.entries:
+            if matched[node]:
+                yield self.path(node, cache)
+
@@ -0,0 +1,291 @@
+import os
+import sys
+import time
+import typing
+
+
+CREATED = "created"
+MODIFIED = "modified"
+DELETED = "deleted"
+
+
+def _coalesce(pending: dict, path: str, event: str):
+    """Merge the new event of the path into the pending events."""
+    previous = pending.get(path)
+    if previous is None:
+        pending[path] = event
+    elif previous == CREATED and event == DELETED:  # created then deleted, nothing happened
+        del pending[path]
+    elif previous == CREATED:  # created then modified, still created
+        pass
+    elif previous == DELETED and event == CREATED:  # deleted then created, modified
+        pending[path] = MODIFIED
+    else:
+        pending[path] = event
+
+
+def _snapshot(root: str, recursive: bool = True) -> dict:
+    """Get `{path: (mtime_ns, size)}` of the files under `root` using `os.scandir()`."""
+    if not os.path.isdir(root):
+        try:
+            stat = os.stat(root)
+            return {root: (stat.st_mtime_ns, stat.st_size)}
+        except OSError:
+            return {}
+    snapshot = {}
+    stack = [root]
+    while stack:
+        dirpath = stack.pop()
+        try:
+            with os.scandir(dirpath) as it:
+                for entry in it:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                            continue
+                        stat = entry.stat(follow_symlinks=False)
+                    except OSError:
+                        continue
+                    snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            continue
+    return snapshot
+
+
+class _Polling:
+    """Detect changes by comparing `os.scandir()` snapshots every `interval` seconds."""
+
+    def __init__(self, root: str, recursive: bool = True, interval: float = 1.0):
+        self.root = root
+        self.recursive = recursive
+        self.interval = interval
+        self.snapshot = _snapshot(root, recursive)
+        self.next_poll = time.monotonic() + interval
+
+    def read(self, timeout: float) -> list:
+        """Wait up to `timeout` seconds, and return the `(event, path)` changes found."""
+        wait = self.next_poll - time.monotonic()
+        if wait > timeout:
+            time.sleep(max(timeout, 0))
+            return []
+        time.sleep(max(wait, 0))
+        self.next_poll = time.monotonic() + self.interval
+        snapshot = _snapshot(self.root, self.recursive)
+        events = []
+        for path, meta in snapshot.items():
+            if path not in self.snapshot:
+                events.append((CREATED, path))
+            elif self.snapshot[path] != meta:
+                events.append((MODIFIED, path))
+        events.extend((DELETED, path) for path in self.snapshot.keys() - snapshot.keys())
+        self.snapshot = snapshot
+        return events
+
+    def close(self):
+        pass
+
+
+class _Inotify:
+    """Receive changes from the Linux kernel through `inotify(7)` using ctypes."""
+    IN_MODIFY = 0x00000002
+    IN_ATTRIB = 0x00000004
+    IN_CLOSE_WRITE = 0x00000008
+    IN_MOVED_FROM = 0x00000040
+    IN_MOVED_TO = 0x00000080
+    IN_CREATE = 0x00000100
+    IN_DELETE = 0x00000200
+    IN_DELETE_SELF = 0x00000400
+    IN_MOVE_SELF = 0x00000800
+    IN_Q_OVERFLOW = 0x00004000
+    IN_IGNORED = 0x00008000
+    IN_ISDIR = 0x40000000
+    IN_NONBLOCK = os.O_NONBLOCK
+    IN_CLOEXEC = getattr(os, "O_CLOEXEC", 0o2000000)
+    MASK = IN_MODIFY | IN_ATTRIB | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_DELETE_SELF | IN_MOVE_SELF
+
+    def __init__(self, root: str, recursive: bool = True):
+        import ctypes
+        import ctypes.util
+        import struct
+
+        if not sys.platform.startswith("linux"):
+            raise OSError("inotify is only available on Linux.")
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._header = struct.Struct("iIII")  # wd, mask, cookie, len
+        self.root = root
+        self.recursive = recursive
+        self.fd = self._libc.inotify_init1(self.IN_NONBLOCK | self.IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+        self.watches: dict = {}  # wd: dirpath
+        self.files: set = set()  # the known files, reported as deleted if their folder is moved out
+        try:
+            self._add_tree(root)
+        except OSError:
+            self.close()
+            raise
+
+    def _add_watch(self, path: str) -> int:
+        import ctypes
+
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(path), self.MASK)
+        if wd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), path)
+        self.watches[wd] = path
+        return wd
+
+    def _add_tree(self, root: str) -> list:
+        """Watch `root` and its sub folders if recursive. Returns the files already inside."""
+        self._add_watch(root)
+        found = []
+        if not os.path.isdir(root):
+            return found
+        stack = [root]
+        while stack:
+            dirpath = stack.pop()
+            try:
+                with os.scandir(dirpath) as it:
+                    for entry in it:
+                        if entry.is_dir(follow_symlinks=False):
+                            if self.recursive:
+                                try:
+                                    self._add_watch(entry.path)
+                                except OSError:  # removed already, or permission denied
+                                    continue
+                                stack.append(entry.path)
+                        else:
+                            found.append(entry.path)
+            except OSError:
+                continue
+        self.files.update(found)
+        return found
+
+    def _remove_tree(self, root: str) -> list:
+        """Stop watching `root` and its sub folders. Returns the known files inside, which are forgotten."""
+        prefix = os.path.join(root, "")
+        for wd, dirpath in list(self.watches.items()):
+            if dirpath == root or dirpath.startswith(prefix):
+                self._libc.inotify_rm_watch(self.fd, wd)  # fails if the watch is removed already, nothing to do
+                del self.watches[wd]
+        gone = [path for path in self.files if path.startswith(prefix)]
+        self.files.difference_update(gone)
+        return gone
+
+    def read(self, timeout: float) -> list:
+        """Wait up to `timeout` seconds, and return the `(event, path)` changes received."""
+        import select
+
+        readable, _, _ = select.select([self.fd], [], [], max(timeout, 0))
+        if not readable:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        events = []
+        offset = 0
+        while offset + self._header.size <= len(data):
+            wd, mask, _cookie, length = self._header.unpack_from(data, offset)
+            offset += self._header.size
+            name = os.fsdecode(data[offset:offset + length].rstrip(b"\0"))
+            offset += length
+            if mask & self.IN_Q_OVERFLOW:  # the kernel queue overflowed, report the root as modified
+                events.append((MODIFIED, self.root))
+                continue
+            if mask & self.IN_IGNORED:
+                self.watches.pop(wd, None)
+                continue
+            dirpath = self.watches.get(wd)
+            if dirpath is None:
+                continue
+            path = os.path.join(dirpath, name) if name else dirpath
+            if mask & (self.IN_CREATE | self.IN_MOVED_TO):
+                if mask & self.IN_ISDIR:
+                    if self.recursive:
+                        try:
+                            events.extend((CREATED, found) for found in self._add_tree(path))  # files created before the watch is added
+                        except OSError:
+                            pass
+                else:
+                    self.files.add(path)
+                    events.append((CREATED, path))
+            elif mask & (self.IN_DELETE | self.IN_MOVED_FROM):
+                if mask & self.IN_ISDIR:  # moved out, or deleted after its files
+                    events.extend((DELETED, gone) for gone in self._remove_tree(path))
+                else:
+                    self.files.discard(path)
+                    events.append((DELETED, path))
+            elif mask & (self.IN_DELETE_SELF | self.IN_MOVE_SELF):
+                if path == self.root:
+                    events.append((DELETED, path))
+            elif not mask & self.IN_ISDIR:  # IN_MODIFY, IN_ATTRIB, IN_CLOSE_WRITE
+                events.append((MODIFIED, path))
+        return events
+
+    def close(self):
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def watch(root: str, callback: typing.Callable, recursive: bool = True, debounce: float = 0.1, backend: str = "auto", poll_interval: float = 1.0, timeout: float | None = None, stop: typing.Any = None):
+    """Watch the changes of files under `root`, and call `callback` with the changes in batches.
+
+    The changes are received from inotify on Linux. Otherwise, the folder is polled and compared by `os.scandir()` snapshots.
+    The changes of the same file are coalesced, e.g. a file created then modified is reported as created only.
+
+    Args:
+        root (str): The folder or the file to watch.
+        callback (callable): The function to handle a batch of changes. `callback(changes: list[tuple[str, str]]) -> bool | None`. Each change is `(event, path)`, and the event is "created", "modified" or "deleted". Return `False` to stop watching.
+        recursive (bool): Watch the sub folders too. Defaults to True.
+        debounce (float): Seconds to wait for more changes before calling `callback`. Defaults to 0.1.
+        backend (str): "inotify", "polling" or "auto". Defaults to "auto", use inotify if available.
+        poll_interval (float): Seconds between 2 snapshots of the polling backend. Defaults to 1.0.
+        timeout (float): Stop watching after N seconds. Defaults to None, watch forever.
+        stop (threading.Event): Stop watching when the event is set. Defaults to None.
+    """
+    IDLE_WAIT = 0.5  # seconds to check `stop` and `timeout` when nothing happens
+    root = os.path.abspath(os.path.expanduser(root))
+    if not os.path.exists(root):
+        raise FileNotFoundError(root)
+    if backend not in ("auto", "inotify", "polling"):
+        raise ValueError(f"invalid backend '{backend}' (auto/inotify/polling)")
+    watcher: typing.Any = None
+    if backend in ("auto", "inotify"):
+        try:
+            watcher = _Inotify(root, recursive=recursive)
+        except (OSError, AttributeError):  # not Linux, no libc, or too many watches
+            if backend == "inotify":
+                raise
+    if watcher is None:
+        watcher = _Polling(root, recursive=recursive, interval=poll_interval)
+    deadline = (time.monotonic() + timeout) if timeout is not None else None
+    max_delay = debounce * 10  # deliver the batch even if the changes never calm down
+    pending: dict = {}
+    first_change = last_change = 0.0
+    try:
+        while not (stop is not None and stop.is_set()):
+            now = time.monotonic()
+            if deadline is not None and now >= deadline:
+                break
+            wait = min(last_change + debounce, first_change + max_delay) - now if pending else IDLE_WAIT
+            if deadline is not None:
+                wait = min(wait, deadline - now)
+            changes = watcher.read(wait)
+            now = time.monotonic()
+            if changes:
+                if not pending:
+                    first_change = now
+                for event, path in changes:
+                    _coalesce(pending, path, event)
+                last_change = now
+            if pending and (now - last_change >= debounce or now - first_change >= max_delay):
+                batch = sorted(((event, path) for path, event in pending.items()), key=lambda change: change[1])
+                pending = {}
+                if callback(batch) is False:
+                    break
+    finally:
+        watcher.close()
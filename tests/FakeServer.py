@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+import http.server
+import threading
+
+
+class FakeServer:
+    '''
+    本地 HTTP 服务器，用于代替远程服务器测试网络请求
+    routes: {path: {"body": bytes, "status": int, "headers": dict, "etag": str}}
+    '''
+    def __init__(self, routes=None):
+        self.routes = routes or {}
+        self.requests = []  # [(method, path, headers, body, client_port)]
+        server = self
+
+        class Handler(http.server.BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def log_message(self, *args):
+                pass
+
+            def handle_any(self):
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length) if length else b""
+                server.requests.append((self.command, self.path, dict(self.headers), body, self.client_address[1]))
+                route = server.routes.get(self.path.split("?")[0])
+                if route is None:
+                    self.send_response(404)
+                    self.send_header("Content-Length", "0")
+                    self.end_headers()
+                    return
+                if callable(route):
+                    route = route(self, body)
+                etag = route.get("etag")
+                if etag and self.headers.get("If-None-Match") == etag:
+                    self.send_response(304)
+                    self.send_header("ETag", etag)
+                    self.end_headers()
+                    return
+                content = route.get("body", b"")
+                self.send_response(route.get("status", 200))
+                if etag:
+                    self.send_header("ETag", etag)
+                for key, value in route.get("headers", {}).items():
+                    self.send_header(key, value)
+                self.send_header("Content-Length", str(len(content)))
+                self.end_headers()
+                if self.command != "HEAD":
+                    self.wfile.write(content)
+
+            do_GET = do_POST = do_HEAD = handle_any
+
+        self.httpd = http.server.ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.httpd.daemon_threads = True
+        self.thread = threading.Thread(target=self.httpd.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True)
+
+    def url(self, path="/"):
+        return "http://127.0.0.1:{}{}".format(self.httpd.server_port, path)
+
+    def start(self):
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *args):
+        self.stop()
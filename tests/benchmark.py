@@ -0,0 +1,225 @@
+# -*- coding: utf-8 -*-
+'''
+Benchmarks of the hot paths on synthetic data generated locally.
+
+Usage:
+    python tests/benchmark.py  # run all, print the JSON report
+    python tests/benchmark.py --quick  # small data, for a smoke test
+    python tests/benchmark.py --file-size 2G --output report.json  # save the report
+    python tests/benchmark.py --baseline report.json --threshold 0.2  # exit 1 if any benchmark is 20% slower than the baseline
+'''
+import os
+import sys
+import json
+import time
+import random
+import argparse
+import contextlib
+import platform
+import tempfile
+
+project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, project_dir)
+import consolecmdtools as cct  # noqa
+
+
+SIZE_UNITS = {"": 1, "K": 1024, "M": 1024 ** 2, "G": 1024 ** 3}
+
+
+def parse_size(text: str) -> int:
+    """Parse a size like "64M" or "2G" into bytes."""
+    text = text.strip().upper().rstrip("B")
+    unit = text[-1] if text and text[-1] in SIZE_UNITS else ""
+    return int(float(text[:len(text) - len(unit)]) * SIZE_UNITS[unit])
+
+
+def make_tree(root: str, depth: int, width: int, files: int) -> int:
+    """Make a tree of `width` folders per level down to `depth`, with `files` small files in each folder. Returns the entries count."""
+    count = 0
+    folders = [root]
+    for _level in range(depth):
+        next_folders = []
+        for folder in folders:
+            for i in range(files):
+                with open(os.path.join(folder, f"file{i}.txt"), "w") as f:
+                    f.write("x" * i)
+                count += 1
+            for i in range(width):
+                subfolder = os.path.join(folder, f"dir{i}")
+                os.mkdir(subfolder)
+                next_folders.append(subfolder)
+                count += 1
+        folders = next_folders
+    return count
+
+
+def make_file(path: str, size: int, chunk_size: int = 16 * 1024 * 1024):
+    """Make a file of random bytes in chunks, so a multi-GB file does not need the memory."""
+    chunk = os.urandom(min(size, chunk_size))
+    with open(path, "wb") as f:
+        written = 0
+        while written < size:
+            f.write(chunk[:size - written])
+            written += len(chunk)
+
+
+def make_texts(lines: int, change_ratio: float = 0.01, seed: int = 0) -> tuple[list, list]:
+    """Make 2 texts of `lines` lines, the second one has about `change_ratio` of the lines changed, inserted or deleted."""
+    rng = random.Random(seed)
+    a = [f"line {i} {rng.random():.8f}" for i in range(lines)]
+    b = []
+    for line in a:
+        roll = rng.random()
+        if roll < change_ratio / 3:
+            continue  # deleted
+        if roll < change_ratio * 2 / 3:
+            b.append(line + " changed")
+            continue
+        b.append(line)
+        if roll < change_ratio:
+            b.append(f"inserted {rng.random():.8f}")
+    return a, b
+
+
+def make_image(path: str, size: int, seed: int = 0) -> bool:
+    """Make a PNG of random blocks. Returns False if pillow is not installed."""
+    try:
+        from PIL import Image
+    except ModuleNotFoundError:
+        return False
+    rng = random.Random(seed)
+    img = Image.new("RGB", (size, size))
+    block = max(size // 16, 1)
+    for x in range(0, size, block):
+        for y in range(0, size, block):
+            img.paste((rng.randrange(256), rng.randrange(256), rng.randrange(256)), (x, y, x + block, y + block))
+    img.save(path)
+    return True
+
+
+def percentile(samples: list, ratio: float) -> float:
+    """Get the percentile of the samples by linear interpolation."""
+    ordered = sorted(samples)
+    position = (len(ordered) - 1) * ratio
+    lower = int(position)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (position - lower)
+
+
+def measure(func, repeat: int, units: int = 1, unit: str = "ops") -> dict:
+    """Call `func()` `repeat` times after a warm-up call, and summarize the latency.
+
+    Args:
+        func (callable): The function to measure.
+        repeat (int): Times to call.
+        units (int): The units processed by one call, like bytes or entries, to get the throughput.
+        unit (str): The name of the units.
+
+    Returns:
+        dict: {"repeat", "unit", "throughput", "min", "mean", "p50", "p90", "p99", "max"}, latencies in seconds, throughput in units per second.
+    """
+    func()  # warm up the caches
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - start)
+    mean = sum(samples) / len(samples)
+    return {
+        "repeat": repeat,
+        "unit": unit,
+        "throughput": units / percentile(samples, 0.5) if percentile(samples, 0.5) else None,
+        "min": min(samples),
+        "mean": mean,
+        "p50": percentile(samples, 0.5),
+        "p90": percentile(samples, 0.9),
+        "p99": percentile(samples, 0.99),
+        "max": max(samples),
+    }
+
+
+def run(workdir: str, file_size: int, tree: tuple, diff_lines: int, image_size: int, repeat: int) -> dict:
+    """Generate the data under `workdir` and run all the benchmarks.
+
+    Returns:
+        dict: {benchmark_name: measure_result}.
+    """
+    results = {}
+    tree_root = os.path.join(workdir, "tree")
+    os.mkdir(tree_root)
+    entries = make_tree(tree_root, *tree)
+    results["bfs_walk"] = measure(lambda: sum(1 for _ in cct.bfs_walk(tree_root)), repeat, entries, "entries")
+    results["ls_tree"] = measure(lambda: cct.ls_tree(tree_root, as_str=True), repeat, entries, "entries")
+    big_file = os.path.join(workdir, "big.bin")
+    make_file(big_file, file_size)
+    results["md5_file"] = measure(lambda: cct.md5(big_file), repeat, file_size, "bytes")
+    results["crc32_file"] = measure(lambda: cct.crc32(big_file), repeat, file_size, "bytes")
+    a, b = make_texts(diff_lines)
+    for engine in ("difflib", "histogram"):
+        results[f"diff_{engine}"] = measure(lambda: cct.diff(a, b, engine=engine), repeat, diff_lines, "lines")
+    text_file = os.path.join(workdir, "text.txt")
+    with open(text_file, "w", encoding="utf-8") as f:
+        f.write("\n".join(a))
+    text_size = os.path.getsize(text_file)
+    results["read_file"] = measure(lambda: cct.read_file(text_file), repeat, text_size, "bytes")
+    image_file = os.path.join(workdir, "image.png")
+    if make_image(image_file, image_size):
+        results["main_color"] = measure(lambda: cct.main_color(image_file), repeat, image_size * image_size, "pixels")
+    return results
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> list:
+    """Compare the p50 latencies with the baseline.
+
+    Returns:
+        list: The regressions, `[{"name", "baseline", "current", "ratio"}]`, slower than the baseline by more than `threshold`.
+    """
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if not base or not base.get("p50"):
+            continue
+        ratio = result["p50"] / base["p50"]
+        if ratio > 1 + threshold:
+            regressions.append({"name": name, "baseline": base["p50"], "current": result["p50"], "ratio": ratio})
+    return regressions
+
+
+def main(argv: list | None = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the hot paths of consolecmdtools.")
+    parser.add_argument("--quick", action="store_true", help="use small data, for a smoke test")
+    parser.add_argument("--file-size", default="64M", help="size of the file to hash, like 64M or 2G")
+    parser.add_argument("--tree", default="4,4,8", help="depth,width,files of the folder tree")
+    parser.add_argument("--diff-lines", type=int, default=20000, help="lines of the texts to diff")
+    parser.add_argument("--image-size", type=int, default=1024, help="width and height of the image")
+    parser.add_argument("--repeat", type=int, default=5, help="times to run each benchmark")
+    parser.add_argument("--output", help="save the report to this JSON file")
+    parser.add_argument("--baseline", help="compare with this saved report")
+    parser.add_argument("--threshold", type=float, default=0.2, help="max ratio slower than the baseline, 0.2 means 20%%")
+    args = parser.parse_args(argv)
+    if args.quick:
+        args.file_size, args.tree, args.diff_lines, args.image_size, args.repeat = "1M", "2,2,4", 500, 64, 2
+    with tempfile.TemporaryDirectory() as workdir, open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):  # keep the logs of the helpers out of the report
+        results = run(workdir, parse_size(args.file_size), tuple(int(n) for n in args.tree.split(",")), args.diff_lines, args.image_size, args.repeat)
+    report = {
+        "version": cct.__version__,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "results": results,
+    }
+    exit_code = 0
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            report["regressions"] = compare(results, json.load(f).get("results", {}), args.threshold)
+        exit_code = 1 if report["regressions"] else 0
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(text)
+    print(text)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,14 +2,21 @@
 import sys
 import platform
 import os
+import io
+import errno
+import shutil
+import json
 import unittest
 import tempfile
+import threading
+import time
 from unittest.mock import patch
 
 import FakeOut
 import FakeIn
 import FakeOs
 import FakeErr
+import FakeServer
 
 test_dir = os.path.dirname(os.path.abspath(__file__))
 project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
@@ -53,6 +60,128 @@ class test_consolecmdtools(unittest.TestCase):
     def test_version(self):
         self.assertTrue(isinstance(cct.__version__, str))
 
+    def test_lazy_import(self):
+        import subprocess
+        code = "import sys, consolecmdtools as cct; cct.md5('x'); cct.get_path('.'); print(' '.join(sys.modules))"
+        proc = subprocess.run([sys.executable, "-X", "importtime", "-c", code], cwd=project_dir, capture_output=True, text=True, check=True)
+        modules = set(proc.stdout.split())
+        for heavy in ("urllib.request", "http.client", "ssl", "json", "pathlib", "consoleiotools"):
+            self.assertNotIn(heavy, modules)
+        import_time = next(int(line.split("|")[1]) for line in proc.stderr.splitlines() if line.endswith("| consolecmdtools"))  # cumulative microseconds
+        self.assertLess(import_time, 50000)
+        self.assertIn("read_url", dir(cct))
+        for name in cct.__all__:
+            self.assertTrue(callable(getattr(cct, name)) or name.isupper(), name)
+        with self.assertRaises(AttributeError):
+            cct.notexist
+
+    def test_benchmark_quick(self):
+        import benchmark
+        with tempfile.TemporaryDirectory() as tmpd:
+            report_path = os.path.join(tmpd, "report.json")
+            self.assertEqual(benchmark.main(["--quick", "--repeat", "1", "--output", report_path]), 0)
+            with open(report_path) as f:
+                results = json.load(f)["results"]
+            self.assertIn("diff_histogram", results)
+            self.assertTrue(all(result["p50"] >= 0 for result in results.values()))
+            slower = {name: dict(result, p50=result["p50"] * 2) for name, result in results.items()}
+            self.assertEqual(len(benchmark.compare(slower, results, threshold=0.5)), len(results))
+            self.assertEqual(benchmark.compare(results, results, threshold=0.5), [])
+
+    def test_metrics_hooks(self):
+        calls = []
+
+        def hook(name, elapsed, nbytes, error):
+            calls.append((name, nbytes, error))
+        cct.metrics.add_hook(hook)
+        try:
+            cct.md5(b"Test Text")
+            filepath = os.path.join(project_dir, "tests", "testfile")
+            cct.read_file(filepath)
+            with self.assertRaises(FileNotFoundError):
+                cct.clone_file("notexist", "notexist2")
+            list(cct.iter_lines(filepath))
+        finally:
+            cct.metrics.remove_hook(hook)
+        cct.md5(b"not recorded")
+        self.assertEqual(calls[0], ("md5", 9, None))
+        self.assertEqual(calls[1], ("read_file", os.path.getsize(filepath), None))
+        self.assertEqual(calls[2][0], "clone_file")
+        self.assertIsInstance(calls[2][2], FileNotFoundError)
+        self.assertEqual(calls[3][0], "iter_lines")
+        self.assertEqual(len(calls), 4)
+
+    def test_metrics_report(self):
+        cct.metrics.reset()
+        cct.metrics.enable()
+        try:
+            for i in range(10):
+                cct.crc32(str(i))
+        finally:
+            cct.metrics.disable()
+        cct.crc32("not recorded")
+        stat = cct.metrics.report()["crc32"]
+        self.assertEqual(stat["calls"], 10)
+        self.assertEqual(stat["bytes"], 10)
+        self.assertEqual(stat["errors"], 0)
+        self.assertTrue(stat["p50"] <= stat["p99"] <= stat["max"])
+        self.assertEqual(json.loads(cct.metrics.to_json())["crc32"]["calls"], 10)
+        recorder = cct.metrics.Recorder(max_samples=5)
+        for i in range(100):
+            recorder("func", i, None, None)
+        self.assertEqual(len(recorder.stats["func"]["samples"]), 5)
+        self.assertEqual(recorder.report()["func"]["calls"], 100)
+        cct.metrics.reset()
+
+    def _run_cli(self, argv: list, stdin: str = "") -> tuple[int, list]:
+        from consolecmdtools.__main__ import main
+        sys.stdin = io.StringIO(stdin)
+        self.fakeout.clean()
+        exit_code = main(argv)
+        return exit_code, [json.loads(line) for line in self.fakeout.buffer.splitlines()]
+
+    def test_cli_hash(self):
+        filepath = os.path.join(project_dir, "tests", "testfile")
+        exit_code, records = self._run_cli(["hash", "--algo", "md5,crc32", filepath])
+        self.assertEqual(exit_code, 0)
+        self.assertEqual(records, [{"input": filepath, "md5": cct.md5(filepath), "crc32": cct.crc32(filepath)}])
+        exit_code, records = self._run_cli(["hash", "-j", "4"], stdin=f"{filepath}\nnotexist\n" * 10)
+        self.assertEqual(exit_code, 1)
+        self.assertEqual(len(records), 20)
+        self.assertEqual(sum("error" in record for record in records), 10)
+        exit_code, records = self._run_cli(["hash", "--text", "-"], stdin="Test Text\n")
+        self.assertEqual(records, [{"input": "Test Text", "md5": "f1feeaa3d698685b6a6179520449e206"}])
+
+    def test_cli_fetch(self):
+        import hashlib
+        filepath = os.path.join(project_dir, "tests", "testfile")
+        routes = {"/path": {"body": filepath.encode()}, "/empty": {"body": b""}}
+        with FakeServer.FakeServer(routes) as server:
+            urls = [server.url("/path"), server.url("/empty")]
+            exit_code, records = self._run_cli(["fetch", *urls])
+        self.assertEqual(exit_code, 0)
+        records = {record["input"]: record for record in records}
+        self.assertEqual(records[urls[0]]["md5"], hashlib.md5(filepath.encode()).hexdigest())
+        self.assertEqual(records[urls[1]], {"input": urls[1], "bytes": 0, "md5": hashlib.md5(b"").hexdigest()})
+
+    def test_cli_tree_diff(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            a, b = os.path.join(tmpd, "a.txt"), os.path.join(tmpd, "b.txt")
+            with open(a, "w") as f:
+                f.write("1\n2\n")
+            with open(b, "w") as f:
+                f.write("1\n3\n")
+            exit_code, records = self._run_cli(["tree", tmpd])
+            self.assertEqual((records[0]["files"], records[0]["size"]), (2, 8))
+            self.assertNotIn("dir_sizes", records[0])
+            exit_code, records = self._run_cli(["diff", a, b, a, a])
+            self.assertEqual(exit_code, 0)
+            self.assertEqual(records[0], {"a": a, "b": b, "same": False, "diff": ["-2", "+3"]})
+            self.assertTrue(records[1]["same"])
+            exit_code, records = self._run_cli(["diff"], stdin=f"{a}\tnotexist\n{a}\n")
+            self.assertEqual(exit_code, 1)
+            self.assertEqual([("error" in record) for record in records], [True, True])
+
     def test_banner(self):
         expect_word = '################\n#  Test Text   #\n################'
         self.assertEqual(expect_word, cct.banner("Test Text"))
@@ -306,6 +435,65 @@ class test_consolecmdtools(unittest.TestCase):
         b = os.path.join(project_dir, "tests", "testfile2")
         self.assertTrue("-{}".format(a) in cct.diff(a, b, force_str=True))
 
+    def test_diff_engines(self):
+        a = ["a", "b", "c", "d", "e"]
+        b = ["a", "x", "c", "d", "e", "f"]
+        expect_diff = cct.diff(a, b, meta=True, context=1, engine="difflib")
+        for engine in ("histogram", "myers"):
+            self.assertEqual(cct.diff(a, b, meta=True, context=1, engine=engine), expect_diff)
+
+    def test_diff_engine_large(self):
+        a = [f"line {i % 10}" for i in range(20000)]
+        b = a[:10000] + ["inserted"] + a[10000:]
+        self.assertEqual(cct.diff(a, b), ["+inserted"])
+
+    def test_diff_engine_invalid(self):
+        with self.assertRaises(ValueError):
+            cct.diff(["a"], ["b"], engine="notexist")
+
+    def test_iter_diff(self):
+        a, b = "test1", "test2"
+        diffs = cct.iter_diff(a, b)
+        self.assertEqual(next(diffs), "-test1")
+        self.assertEqual(next(diffs), "+test2")
+
+    def test_diff_same_files(self):
+        a = os.path.join(project_dir, "tests", "testfile")
+        self.assertEqual(cct.diff(a, a), [])
+
+    def test_compare_trees(self):
+        with tempfile.TemporaryDirectory() as tmpa, tempfile.TemporaryDirectory() as tmpb:
+            for root in (tmpa, tmpb):
+                os.makedirs(os.path.join(root, "sub"))
+                with open(os.path.join(root, "sub", "same.txt"), "w") as f:
+                    f.write("same")
+            with open(os.path.join(tmpa, "changed.txt"), "w") as f:
+                f.write("old\n")
+            with open(os.path.join(tmpb, "changed.txt"), "w") as f:
+                f.write("new\n")
+            open(os.path.join(tmpa, "removed.txt"), "w").close()
+            os.makedirs(os.path.join(tmpb, "added"))
+            result = cct.compare_trees(tmpa, tmpb, shallow=False, diffs=True)
+            self.assertEqual(result["only_a"], ["removed.txt"])
+            self.assertEqual(result["only_b"], ["added"])
+            self.assertEqual(result["changed"], ["changed.txt"])
+            self.assertEqual(result["same"], [os.path.join("sub", "same.txt")])
+            self.assertEqual(result["diffs"]["changed.txt"], ["-old", "+new"])
+
+    @unittest.skipIf(platform.system() == "Windows", "symlinks need privileges on Windows")
+    def test_compare_trees_many_and_loops(self):
+        with tempfile.TemporaryDirectory() as tmpa, tempfile.TemporaryDirectory() as tmpb:
+            for root in (tmpa, tmpb):
+                os.makedirs(os.path.join(root, "sub"))
+                os.symlink("..", os.path.join(root, "sub", "loop"))  # back to the root
+                for i in range(50):
+                    with open(os.path.join(root, f"file{i}"), "w") as f:
+                        f.write("same" if i % 2 else f"{root}")
+            result = cct.compare_trees(tmpa, tmpb, shallow=False, workers=2)
+            self.assertEqual(len(result["same"]), 25)
+            self.assertEqual(len(result["changed"]), 25)
+            self.assertEqual(result["only_a"], [])
+
     @unittest.skipIf(OFFLINE_MODE, 'Offline mode')
     def test_update_file(self):
         url = "https://raw.githubusercontent.com/kyan001/PyConsoleCMDTools/main/tests/testfile"
@@ -315,11 +503,106 @@ class test_consolecmdtools(unittest.TestCase):
         self.assertFalse(result)
         self.assertIn(expect, self.fakeout.readline())
 
+    def test_update_file_revalidate(self):
+        with tempfile.TemporaryDirectory() as tmpd, FakeServer.FakeServer() as server:
+            filepath = os.path.join(tmpd, "script.py")
+            with open(filepath, "wb") as f:
+                f.write(b"v1")
+            server.routes["/script.py"] = {"body": b"v1", "etag": '"e1"'}
+            self.assertFalse(cct.update_file(filepath, server.url("/script.py"), cache_dir=tmpd))
+            self.assertNotIn("If-None-Match", server.requests[-1][2])
+            self.assertFalse(cct.update_file(filepath, server.url("/script.py"), cache_dir=tmpd))  # 304 Not Modified
+            self.assertEqual(server.requests[-1][2].get("If-None-Match"), '"e1"')
+            self.assertIn("already up-to-date", self.fakeout.readline())
+            server.routes["/script.py"] = {"body": b"v2", "etag": '"e2"'}
+            self.fakein.write("Yes")
+            self.assertTrue(cct.update_file(filepath, server.url("/script.py"), cache_dir=tmpd))
+            with open(filepath, "rb") as f:
+                self.assertEqual(f.read(), b"v2")
+
+    def test_update_files(self):
+        with tempfile.TemporaryDirectory() as tmpd, FakeServer.FakeServer() as server:
+            pairs = []
+            for name, local, remote in (("same", b"same", b"same"), ("new1", b"old", b"new1"), ("new2", b"old", b"new2")):
+                filepath = os.path.join(tmpd, name)
+                with open(filepath, "wb") as f:
+                    f.write(local)
+                server.routes["/" + name] = {"body": remote}
+                pairs.append((filepath, server.url("/" + name)))
+            self.fakein.write("Yes")  # asked only once
+            result = cct.update_files(pairs, max_concurrency=3, cache_dir=tmpd)
+            self.assertEqual(list(result.values()), [False, True, True])
+            for (filepath, _url), expect in zip(pairs, (b"same", b"new1", b"new2")):
+                with open(filepath, "rb") as f:
+                    self.assertEqual(f.read(), expect)
+
     def test_read_file(self):
         filepath = os.path.join(project_dir, "tests", "testfile")
         content = cct.read_file(filepath)
         self.assertEqual(content, "This file should not changed\n")
 
+    def test_read_file_open_args(self):
+        filepath = os.path.join(project_dir, "tests", "testfile")
+        opened = []
+
+        def opener(path, flags):
+            opened.append(path)
+            return os.open(path, flags)
+        self.assertEqual(cct.read_file(filepath, "r", 1, opener=opener), "This file should not changed\n")
+        self.assertEqual(opened, [filepath])
+        with self.assertRaises(TypeError):
+            cct.read_file(filepath, notexist=True)
+
+    def test_read_file_fallback(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            filepath = os.path.join(tmpd, "latin")
+            with open(filepath, "wb") as f:
+                f.write(("a" * 100000 + "é").encode("cp1252"))  # not utf-8 after the sample
+            self.assertEqual(cct.detect_encoding(filepath), "utf-8")
+            self.assertEqual(cct.read_file(filepath), "a" * 100000 + "é")
+            self.assertIn("cp1252", self.fakeout.readline())
+
+    def test_read_file_bom(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            filepath = os.path.join(tmpd, "utf16")
+            with open(filepath, "wb") as f:
+                f.write("héllo\r\nworld".encode("utf-16"))
+            self.assertEqual(cct.detect_encoding(filepath), "utf-16")
+            self.assertEqual(cct.read_file(filepath), "héllo\nworld")
+
+    def test_iter_lines(self):
+        filepath = os.path.join(project_dir, "tests", "testfile")
+        self.assertEqual(list(cct.iter_lines(filepath)), ["This file should not changed\n"])
+
+    def test_line_index(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            filepath = os.path.join(tmpd, "log")
+            index_path = os.path.join(tmpd, "log.idx")
+            with open(filepath, "w") as f:
+                f.write("".join(f"line {i}\n" for i in range(1000)))
+            with cct.LineIndex(filepath, index_path=index_path) as index:
+                self.assertEqual(len(index), 1000)
+                self.assertEqual(index[0], "line 0")
+                self.assertEqual(index[-1], "line 999")
+                self.assertEqual(index.lines(10, 12), ["line 10", "line 11"])
+            self.assertTrue(os.path.exists(index_path))
+            with open(filepath, "a") as f:
+                f.write("appended")
+            with cct.LineIndex(filepath, index_path=index_path) as index:  # reuse the saved index
+                self.assertEqual(len(index), 1001)
+                self.assertEqual(index[-1], "appended")
+                inode = os.stat(index_path).st_ino
+                with open(filepath, "a") as f:
+                    f.write(" line\nnew line\n")
+                self.assertEqual(index.refresh(), 1002)
+                self.assertEqual(index[-2:], ["appended line", "new line"])
+                self.assertEqual(os.stat(index_path).st_ino, inode)  # appended in place, not rewritten
+            with open(index_path, "ab") as f:  # offsets of an interrupted save, beyond the indexed size in the header
+                f.write((10 ** 9).to_bytes(8, "little"))
+            with cct.LineIndex(filepath, index_path=index_path) as index:
+                self.assertEqual(len(index), 1002)
+                self.assertEqual(index[-1], "new line")
+
     def test_copy_file(self):
         with tempfile.TemporaryDirectory() as tmpd:
             with tempfile.NamedTemporaryFile(dir=tmpd, delete=False) as fsrc, tempfile.NamedTemporaryFile(dir=tmpd) as fdst:
@@ -389,6 +672,58 @@ class test_consolecmdtools(unittest.TestCase):
             self.assertFalse(os.path.exists(src))
             self.assertTrue(os.path.exists(dst))
 
+    def test_move_file_backup_strategies(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            src, dst = os.path.join(tmpd, "src"), os.path.join(tmpd, "dst")
+            for index, strategy in enumerate(cct.BACKUP_STRATEGIES):
+                with open(src, "w") as f:
+                    f.write(f"new{index}")
+                with open(dst, "w") as f:
+                    f.write(f"old{index}")
+                cct.move_file(src, dst, copy=True, backup=strategy, delta=True)
+                with open(dst) as f:
+                    self.assertEqual(f.read(), f"new{index}")
+                latest = cct.rotate_backups(dst, keep=None)  # nothing deleted
+                self.assertEqual(latest, [])
+                backups = sorted(name for name in os.listdir(tmpd) if ".backup." in name)
+                self.assertEqual(len(backups), index + 1)
+                with open(os.path.join(tmpd, backups[-1])) as f:
+                    self.assertEqual(f.read(), f"old{index}")
+
+    def test_move_file_backup_hardlink_cross_device(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            src, dst = os.path.join(tmpd, "src"), os.path.join(tmpd, "dst")
+            with open(src, "w") as f:
+                f.write("new")
+            with open(dst, "w") as f:
+                f.write("old")
+            with patch("os.rename", side_effect=OSError(errno.EXDEV, "Invalid cross-device link")):  # shutil.move falls back to copy
+                cct.move_file(src, dst, backup="hardlink")
+            self.assertFalse(os.path.exists(src))
+            with open(dst) as f:
+                self.assertEqual(f.read(), "new")
+            backups = [name for name in os.listdir(tmpd) if ".backup." in name]
+            self.assertEqual(len(backups), 1)
+            with open(os.path.join(tmpd, backups[0])) as f:
+                self.assertEqual(f.read(), "old")
+
+    def test_move_file_backup_rotation(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            src, dst = os.path.join(tmpd, "src"), os.path.join(tmpd, "dst")
+            for index in range(5):
+                with open(src, "w") as f:
+                    f.write("x" * 10)
+                with open(dst, "w") as f:
+                    f.write(str(index) * 10)
+                cct.move_file(src, dst, backup="rename", backup_keep=3)
+            backups = sorted(name for name in os.listdir(tmpd) if ".backup." in name)
+            self.assertEqual(len(backups), 3)
+            with open(os.path.join(tmpd, backups[-1])) as f:
+                self.assertEqual(f.read(), "4" * 10)
+            deleted = cct.rotate_backups(dst, max_size=25)
+            self.assertEqual(len(deleted), 1)
+            self.assertEqual(len([name for name in os.listdir(tmpd) if ".backup." in name]), 2)
+
     def test_move_file_msgout(self):
         with tempfile.TemporaryDirectory() as tmpd:
             with tempfile.NamedTemporaryFile(dir=tmpd, delete=False) as fsrc, tempfile.NamedTemporaryFile(dir=tmpd, delete=False) as fdst:
@@ -411,6 +746,98 @@ class test_consolecmdtools(unittest.TestCase):
             cct.move_file(src, dst, ensure=True)
             self.assertTrue(os.path.exists(dst))
 
+    def test_copy_file_delta(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            src = os.path.join(tmpd, "src")
+            dst = os.path.join(tmpd, "dst")
+            for src_content, dst_content in ((b"a" * 3000000, b"a" * 2000000 + b"b" * 1500000), (b"c" * 10, b""), (b"", b"d" * 10)):
+                with open(src, "wb") as f:
+                    f.write(src_content)
+                with open(dst, "wb") as f:
+                    f.write(dst_content)
+                cct.copy_file(src, dst, delta=True, msgout=print)
+                self.assertIn("delta copied", self.fakeout.readline())
+                with open(dst, "rb") as f:
+                    self.assertEqual(f.read(), src_content)
+
+    def test_clone_file(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            src = os.path.join(tmpd, "src")
+            content = os.urandom(300000)
+            with open(src, "wb") as f:
+                f.write(content)
+            for methods in (cct.COPY_METHODS, ("copy_file_range", "copy2"), ("copy2",)):
+                dst = os.path.join(tmpd, "dst")
+                self.assertIn(cct.clone_file(src, dst, methods=methods), methods)
+                with open(dst, "rb") as f:
+                    self.assertEqual(f.read(), content)
+            with self.assertRaises(shutil.SameFileError):
+                cct.clone_file(src, src)
+            cct.copy_file(src, os.path.join(tmpd, "dst"), msgout=print)
+            self.assertIn("copied to", self.fakeout.readline())
+
+    @unittest.skipUnless(platform.system() == "Linux", "Linux only")
+    def test_clone_file_fallback(self):
+        import errno
+        with tempfile.TemporaryDirectory() as tmpd:
+            src, dst = os.path.join(tmpd, "src"), os.path.join(tmpd, "dst")
+            with open(src, "wb") as f:
+                f.write(b"data")
+            with patch("fcntl.ioctl") as ioctl:  # reflink succeeds
+                self.assertEqual(cct.clone_file(src, dst), "reflink")
+                self.assertEqual(ioctl.call_args[0][1], cct.FICLONE)
+            not_supported = OSError(errno.EOPNOTSUPP, "Operation not supported")
+            with patch("fcntl.ioctl", side_effect=not_supported):
+                expected = "copy_file_range" if hasattr(os, "copy_file_range") else "copy2"
+                self.assertEqual(cct.clone_file(src, dst), expected)
+                with patch("os.copy_file_range", side_effect=not_supported, create=True):
+                    self.assertEqual(cct.clone_file(src, dst), "copy2")
+            with open(dst, "rb") as f:
+                self.assertEqual(f.read(), b"data")
+            if os.path.exists("/proc/version"):  # reports size 0, but has content
+                self.assertEqual(cct.clone_file("/proc/version", dst, methods=("copy_file_range", "copy2")), "copy2")
+                with open(dst, "rb") as f, open("/proc/version", "rb") as f_proc:
+                    self.assertEqual(f.read(), f_proc.read())
+
+    def _make_files(self, root, count):
+        srcs = []
+        for i in range(count):
+            src = os.path.join(root, f"src{i}")
+            with open(src, "w") as f:
+                f.write("x" * i)
+            srcs.append(src)
+        return srcs
+
+    def test_copy_files(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            srcs = self._make_files(tmpd, 20)
+            pairs = [(src, os.path.join(tmpd, "out", str(i % 3), os.path.basename(src))) for i, src in enumerate(srcs)]
+            pairs.append((os.path.join(tmpd, "notexist"), os.path.join(tmpd, "out", "notexist")))
+            progresses = []
+            result = cct.copy_files(pairs, workers=4, progress=lambda *args: progresses.append(args))
+            self.assertEqual(result["done"], 20)
+            self.assertEqual(result["bytes"], sum(range(20)))
+            self.assertEqual(list(result["errors"]), [os.path.join(tmpd, "notexist")])
+            self.assertEqual(progresses[-1], (21, 21, sum(range(20))))
+            for src, dst in pairs[:-1]:
+                self.assertTrue(os.path.exists(src))
+                with open(dst) as f:
+                    self.assertEqual(len(f.read()), os.path.getsize(src))
+
+    def test_move_files(self):
+        import errno
+        with tempfile.TemporaryDirectory() as tmpd:
+            srcs = self._make_files(tmpd, 10)
+            pairs = [(src, os.path.join(tmpd, "out", os.path.basename(src))) for src in srcs]
+            result = cct.move_files(pairs)
+            self.assertEqual((result["done"], result["errors"]), (10, {}))
+            self.assertTrue(all(not os.path.exists(src) and os.path.exists(dst) for src, dst in pairs))
+            cross_device = OSError(errno.EXDEV, "Invalid cross-device link")
+            with patch("os.replace", side_effect=cross_device):  # moved by copying and removing on the pool
+                result = cct.move_files([(dst, src) for src, dst in pairs])
+            self.assertEqual((result["done"], result["errors"]), (10, {}))
+            self.assertTrue(all(os.path.exists(src) and not os.path.exists(dst) for src, dst in pairs))
+
     @unittest.skipIf(OFFLINE_MODE, 'Offline mode')
     def test_ajax_get(self):
         url = "https://yesno.wtf/api"
@@ -419,6 +846,264 @@ class test_consolecmdtools(unittest.TestCase):
         answer = result.get("answer")
         self.assertEqual(answer, "yes")
 
+    def test_read_url_pool(self):
+        with FakeServer.FakeServer({"/data": {"body": b"data"}}) as server, cct.ConnectionPool(max_per_host=2) as pool:
+            for _ in range(3):
+                self.assertEqual(cct.read_url(server.url("/data"), pool=pool), b"data")
+            self.assertEqual(len({request[4] for request in server.requests}), 1)  # one keep-alive connection
+
+    def test_pool_retry_idempotent_only(self):
+        import http.client
+        calls = []
+
+        def route(handler, body):
+            calls.append(handler.command)
+            raise ConnectionAbortedError("processed, then the connection is dropped")
+        with FakeServer.FakeServer({"/data": {"body": b"data"}, "/drop": route}) as server, cct.ConnectionPool() as pool:
+            self.assertEqual(pool.request("GET", server.url("/data")).read(), b"data")  # an idle keep-alive connection to reuse
+            with self.assertRaises(http.client.RemoteDisconnected):
+                pool.request("POST", server.url("/drop"), body=b"x")
+            self.assertEqual(calls, ["POST"])  # not sent again
+            self.assertEqual(pool.request("GET", server.url("/data")).read(), b"data")
+            with self.assertRaises(http.client.RemoteDisconnected):
+                pool.request("GET", server.url("/drop"))
+            self.assertEqual(calls, ["POST", "GET", "GET"])  # retried once on a new connection
+
+    def test_read_url_installed_opener(self):
+        import urllib.request
+        from consolecmdtools import httppool
+        seen = []
+
+        class Recorder(urllib.request.BaseHandler):
+            def http_request(self, request):
+                seen.append(request.full_url)
+                return request
+
+        with FakeServer.FakeServer({"/data": {"body": b"data"}}) as server:
+            self.assertTrue(httppool.is_poolable(server.url("/data")))
+            try:
+                urllib.request.install_opener(urllib.request.build_opener())  # same as the one kept by `urlopen()`
+                self.assertTrue(httppool.is_poolable(server.url("/data")))
+                urllib.request.install_opener(urllib.request.build_opener(Recorder()))
+                self.assertFalse(httppool.is_poolable(server.url("/data")))
+                self.assertEqual(cct.read_url(server.url("/data")), b"data")
+            finally:
+                urllib.request.install_opener(None)
+            self.assertEqual(seen, [server.url("/data")])  # through the handlers of the opener, not the pool
+            with patch.dict(os.environ, {"http_proxy": "http://127.0.0.1:9"}):
+                self.assertFalse(httppool.is_poolable(server.url("/data")))
+
+    def test_read_url_no_pool(self):
+        with FakeServer.FakeServer({"/data": {"body": b"data"}}) as server:
+            self.assertEqual(cct.read_url(server.url("/data"), pool=False), b"data")
+
+    def test_read_url_pool_error(self):
+        import urllib.error
+        with FakeServer.FakeServer() as server, cct.ConnectionPool() as pool:
+            with self.assertRaises(urllib.error.HTTPError):
+                cct.read_url(server.url("/notexist"), pool=pool)
+
+    def test_ajax_pool(self):
+        with FakeServer.FakeServer({"/api": lambda handler, body: {"body": body or b'{"answer": "yes"}'}}) as server:
+            self.assertEqual(cct.ajax(server.url("/api"), {"force": "yes"}), {"answer": "yes"})
+            self.assertEqual(cct.ajax(server.url("/api"), {"echo": 1}, method="post"), {"echo": 1})
+            self.assertEqual(server.requests[0][1], "/api?force=yes")
+
+    def test_read_url_cache(self):
+        with tempfile.TemporaryDirectory() as tmpd, FakeServer.FakeServer({"/data": {"body": b"data", "headers": {"Cache-Control": "max-age=60"}}}) as server:
+            cache = cct.ResponseCache(tmpd)
+            self.assertEqual(cct.read_url(server.url("/data"), cache=cache), b"data")
+            self.assertEqual(cct.read_url(server.url("/data"), cache=cache), b"data")
+            self.assertEqual(len(server.requests), 1)
+            server.routes["/data"] = {"body": b"new", "headers": {"Cache-Control": "no-store"}}
+            cache.clear()
+            self.assertEqual(cct.read_url(server.url("/data"), cache=cache), b"new")
+            self.assertEqual(cct.read_url(server.url("/data"), cache=cache), b"new")
+            self.assertEqual(len(server.requests), 3)
+
+    def test_read_url_cache_revalidate(self):
+        with tempfile.TemporaryDirectory() as tmpd, FakeServer.FakeServer({"/data": {"body": b"data", "etag": '"e1"', "headers": {"Cache-Control": "no-cache"}}}) as server:
+            cache = cct.ResponseCache(tmpd)
+            self.assertEqual(cct.read_url(server.url("/data"), cache=cache), b"data")
+            self.assertEqual(cct.read_url(server.url("/data"), cache=cache), b"data")  # 304 Not Modified
+            self.assertEqual(server.requests[-1][2].get("If-None-Match"), '"e1"')
+
+    def test_read_url_cache_stale_while_revalidate(self):
+        with tempfile.TemporaryDirectory() as tmpd, FakeServer.FakeServer({"/data": {"body": b"old", "headers": {"Cache-Control": "max-age=0"}}}) as server:
+            cache = cct.ResponseCache(tmpd, stale_while_revalidate=True)
+            self.assertEqual(cct.read_url(server.url("/data"), cache=cache), b"old")
+            server.routes["/data"] = {"body": b"new", "headers": {"Cache-Control": "max-age=60"}}
+            self.assertEqual(cct.read_url(server.url("/data"), cache=cache), b"old")  # stale, revalidating in background
+            for _ in range(50):
+                if len(server.requests) == 2:
+                    break
+                time.sleep(0.02)
+            time.sleep(0.1)
+            self.assertEqual(cct.read_url(server.url("/data"), cache=cache), b"new")
+
+    def test_read_url_cache_evict(self):
+        routes = {f"/{i}": {"body": b"x" * 100} for i in range(5)}
+        with tempfile.TemporaryDirectory() as tmpd, FakeServer.FakeServer(routes) as server:
+            cache = cct.ResponseCache(tmpd, max_size=250)
+            for i in range(5):
+                cct.read_url(server.url(f"/{i}"), cache=cache)
+                time.sleep(0.01)
+            self.assertEqual(len([name for name in os.listdir(tmpd) if name.endswith(".bin")]), 2)
+
+    def test_read_url_compressed(self):
+        import gzip
+        import zlib
+        content = b'{"data": "' + b"x" * 100000 + b'"}'
+        raw_deflate = zlib.compressobj(wbits=-zlib.MAX_WBITS)
+        routes = {
+            "/gzip": {"body": gzip.compress(content), "headers": {"Content-Encoding": "gzip"}},
+            "/deflate": {"body": zlib.compress(content), "headers": {"Content-Encoding": "deflate"}},
+            "/raw-deflate": {"body": raw_deflate.compress(content) + raw_deflate.flush(), "headers": {"Content-Encoding": "deflate"}},
+        }
+        with FakeServer.FakeServer(routes) as server:
+            for path in routes:
+                self.assertEqual(cct.read_url(server.url(path)), content)
+            self.assertIn("gzip", server.requests[0][2]["Accept-Encoding"])
+            self.assertEqual(cct.ajax(server.url("/gzip"), pool=False), {"data": "x" * 100000})
+
+    def test_ajax_compress(self):
+        import gzip
+
+        def route(handler, body):
+            if handler.headers.get("Content-Encoding") == "gzip":
+                body = gzip.decompress(body)
+            return {"body": body}
+
+        def reject_route(handler, body):
+            if handler.headers.get("Content-Encoding"):
+                return {"status": 415}
+            return {"body": body}
+
+        with FakeServer.FakeServer({"/api": route, "/plain": reject_route}) as server:
+            self.assertEqual(cct.ajax(server.url("/api"), {"echo": 1}, method="post", compress=True), {"echo": 1})
+            self.assertEqual(server.requests[-1][2]["Content-Encoding"], "gzip")
+            self.assertEqual(cct.ajax(server.url("/plain"), {"echo": 2}, method="post", compress="gzip"), {"echo": 2})
+            self.assertEqual(len(server.requests), 3)
+
+    def test_ajax_stream(self):
+        items = [{"id": i, "value": 12.5 * i, "name": "é" * i} for i in range(100)]
+        routes = {
+            "/array": {"body": json.dumps(items).encode()},
+            "/ndjson": {"body": "\n".join(json.dumps(item) for item in items).encode()},
+        }
+        with FakeServer.FakeServer(routes) as server:
+            for path in routes:
+                result = cct.ajax(server.url(path), stream=True, backend="json")
+                self.assertNotIsInstance(result, (list, dict))
+                self.assertEqual(list(result), items)
+            self.assertEqual(list(cct.ajax(server.url("/ndjson"), stream="ndjson")), items)
+
+    def test_json_stream_chunks(self):
+        import io
+        from consolecmdtools import jsonstream
+        data = b'[123.456, -7e3, "a\\"]", {"b": [1, 2]}, true, null, "\xc3\xa9"]'
+        expected = json.loads(data)
+        for chunk_size in range(1, len(data) + 1):
+            self.assertEqual(list(jsonstream.iter_items(io.BytesIO(data), format="array", backend="json", chunk_size=chunk_size)), expected)
+        with self.assertRaises(ValueError):
+            list(jsonstream.iter_items(io.BytesIO(b'[1, 2'), format="array", backend="json"))
+        for backend in ("json", "ijson"):
+            if backend == "ijson" and not jsonstream._has_module("ijson"):
+                continue
+            with self.assertRaises(ValueError):
+                list(jsonstream.iter_items(io.BytesIO(b'[1, 2] [3]'), format="array", backend=backend, chunk_size=4))
+            self.assertEqual(list(jsonstream.iter_items(io.BytesIO(b'[1, 2]\n \n'), format="array", backend=backend, chunk_size=4)), [1, 2])
+            for invalid in (b'[1 2]', b'[,1]', b'[1,,2]', b'[1,]'):
+                for chunk_size in (1, 64):
+                    with self.assertRaises(ValueError):
+                        list(jsonstream.iter_items(io.BytesIO(invalid), format="array", backend=backend, chunk_size=chunk_size))
+        self.assertEqual(list(jsonstream.iter_items(io.BytesIO(b'[]'), format="array", backend="json")), [])
+        long_line = b'"' + b"x" * 100000 + b'"'
+        self.assertEqual(list(jsonstream.iter_items(io.BytesIO(long_line + b"\n1\n" + long_line), format="ndjson", backend="json", chunk_size=7)), [json.loads(long_line), 1, json.loads(long_line)])
+        for chunk_size in (1, 3, 64):
+            self.assertEqual(list(jsonstream.iter_items(io.BytesIO(b'[1, 2]\n[3, 4]\n'), backend="json", chunk_size=chunk_size)), [[1, 2], [3, 4]])
+            self.assertEqual(list(jsonstream.iter_items(io.BytesIO(b'[\n  [1, 2],\n  [3]\n]\n'), backend="json", chunk_size=chunk_size)), [[1, 2], [3]])
+            self.assertEqual(list(jsonstream.iter_items(io.BytesIO(b' [1, 2]\n'), backend="json", chunk_size=chunk_size)), [1, 2])
+
+    @staticmethod
+    def _range_route(content, etag):
+        def route(handler, body):
+            match = handler.headers.get("Range", "").partition("=")[2]
+            if match and handler.headers.get("If-Range") == etag:
+                start = int(match.rstrip("-"))
+                return {"body": content[start:], "status": 206, "headers": {"ETag": etag, "Content-Range": f"bytes {start}-{len(content) - 1}/{len(content)}"}}
+            return {"body": content, "headers": {"ETag": etag}}
+        return route
+
+    def test_download_file(self):
+        import hashlib
+        content = os.urandom(100000)
+        with tempfile.TemporaryDirectory() as tmpd, FakeServer.FakeServer({"/file": self._range_route(content, '"v1"')}) as server:
+            dst = os.path.join(tmpd, "sub", "file.bin")
+            progresses = []
+            digest = "sha256:" + hashlib.sha256(content).hexdigest()
+            self.assertEqual(cct.download_file(server.url("/file"), dst, progress=lambda done, total: progresses.append((done, total)), digest=digest, chunk_size=30000), dst)
+            with open(dst, "rb") as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(progresses, [(30000, 100000), (60000, 100000), (90000, 100000), (100000, 100000)])
+            self.assertEqual(sorted(os.listdir(os.path.dirname(dst))), ["file.bin"])
+
+    def test_download_file_resume(self):
+        content = os.urandom(100000)
+        with tempfile.TemporaryDirectory() as tmpd, FakeServer.FakeServer({"/file": self._range_route(content, '"v1"')}) as server:
+            dst = os.path.join(tmpd, "file.bin")
+            with open(dst + ".part", "wb") as f:
+                f.write(content[:40000])
+            with open(dst + ".part.json", "w") as f:
+                f.write('{"url": "%s", "etag": "\\"v1\\"", "last_modified": null, "total": 100000}' % server.url("/file"))
+            cct.download_file(server.url("/file"), dst)
+            with open(dst, "rb") as f:
+                self.assertEqual(f.read(), content)
+            self.assertEqual(server.requests[-1][2].get("Range"), "bytes=40000-")
+            with open(dst + ".part", "wb") as f:  # the remote file is changed since the partial download
+                f.write(b"x" * 40000)
+            with open(dst + ".part.json", "w") as f:
+                f.write('{"url": "%s", "etag": "\\"v0\\"", "last_modified": null, "total": 100000}' % server.url("/file"))
+            cct.download_file(server.url("/file"), dst)
+            with open(dst, "rb") as f:
+                self.assertEqual(f.read(), content)
+
+    def test_download_file_digest_mismatch(self):
+        with tempfile.TemporaryDirectory() as tmpd, FakeServer.FakeServer({"/file": {"body": b"data"}}) as server:
+            dst = os.path.join(tmpd, "file.bin")
+            with self.assertRaises(ValueError):
+                cct.download_file(server.url("/file"), dst, digest="md5:0000")
+            self.assertEqual(os.listdir(tmpd), [])
+
+    def test_fetch_many(self):
+        routes = {f"/{i}": {"body": str(i).encode()} for i in range(20)}
+        with FakeServer.FakeServer(routes) as server:
+            urls = [server.url(f"/{i}") for i in range(20)] + [server.url("/notexist")]
+            results = list(cct.fetch_many(urls, concurrency=4))
+            self.assertEqual(len(results), 21)
+            contents = {result["url"]: result["content"] for result in results if not result["error"]}
+            self.assertEqual(contents, {server.url(f"/{i}"): str(i).encode() for i in range(20)})
+            errors = [result for result in results if result["error"]]
+            self.assertEqual(errors[0]["url"], server.url("/notexist"))
+            read = []
+
+            def endless():
+                while True:
+                    read.append(None)
+                    yield server.url("/0")
+
+            results = cct.fetch_many(endless(), concurrency=2)
+            self.assertEqual(next(results)["content"], b"0")  # yielded before the endless urls are read
+            results.close()
+            self.assertLessEqual(len(read), 2 * 4 + 1)
+
+    def test_read_url_async(self):
+        import asyncio
+        with FakeServer.FakeServer({"/data": {"body": b"data"}, "/api": {"body": b'{"answer": "yes"}'}}) as server:
+            async def fetch():
+                return await asyncio.gather(cct.read_url_async(server.url("/data")), cct.ajax_async(server.url("/api")))
+            self.assertEqual(asyncio.run(fetch()), [b"data", {"answer": "yes"}])
+
     def test_is_python3(self):
         self.assertEqual(cct.is_python3(), True)
 
@@ -456,11 +1141,191 @@ class test_consolecmdtools(unittest.TestCase):
         result = cct.get_paths(root)
         self.assertIn(os.path.join(root, "test_consolecmdtools.py"), result)
 
+    def test_get_paths_compact(self):
+        for root in ("tests", "."):
+            result = cct.get_paths(root, compact=True)
+            self.assertIsInstance(result, cct.PathList)
+            self.assertEqual(list(result), cct.get_paths(root))
+        is_py = lambda path: path.suffix == ".py"  # noqa: E731
+        self.assertEqual(list(cct.get_paths("tests", is_py, compact=True)), cct.get_paths("tests", is_py))
+
+    def test_pathlist(self):
+        paths = ["/", "/a", "/a/b", "/a/b/c.txt", "/a/bc", "a/b", "a//b/", "", "./x", "/a", "//n/é"]
+        result = cct.PathList(paths)
+        self.assertEqual(list(result), paths)
+        self.assertEqual(len(result), len(paths))
+        self.assertEqual(result[-1], paths[-1])
+        self.assertEqual(result[1:4], paths[1:4])
+        for prefix in ("", "/", "/a", "/a/", "/a/b", "a/", "./", "//"):
+            self.assertEqual(list(result.startswith(prefix)), [path for path in paths if path.startswith(prefix)], prefix)
+        top = result.add("/root/d/", entry=False)
+        result.add("e", parent=top)
+        self.assertEqual(result[-1], "/root/d/e")
+        self.assertEqual(len(result), len(paths) + 1)
+        many = [f"/root/folder{i // 100}/file{i}.txt" for i in range(10000)]
+        self.assertLess(sys.getsizeof(cct.PathList(many)), sum(map(sys.getsizeof, many)) // 2)
+
+    def test_search_files(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            files = {
+                "a.py": "import os\nTODO: first\n\ntodo: second TODO\n",
+                "b.txt": "TODO: no newline at end",
+                "empty.txt": "",
+                "sub/c.py": "x = 1\r\n# TODO: crlf\r\n",
+                ".git/d.py": "TODO: excluded\n",
+            }
+            for relpath, content in files.items():
+                os.makedirs(os.path.join(tmpd, os.path.dirname(relpath)), exist_ok=True)
+                with open(os.path.join(tmpd, relpath), "w", newline="") as f:
+                    f.write(content)
+            with open(os.path.join(tmpd, "e.bin"), "wb") as f:
+                f.write(b"TODO\0binary")
+            found = lambda **kwargs: [(os.path.relpath(m["path"], tmpd).replace(os.sep, "/"), m["line"], m["text"]) for m in cct.search_files(tmpd, "TODO", exclude=[".git"], **kwargs)]  # noqa: E731
+            self.assertEqual(found(), [("a.py", 2, "TODO: first"), ("a.py", 4, "todo: second TODO"), ("b.txt", 1, "TODO: no newline at end"), ("sub/c.py", 2, "# TODO: crlf")])
+            self.assertEqual(len(found(ignore_case=True)), 4)
+            self.assertEqual([m[0] for m in found(include=["*.py"])], ["a.py", "a.py", "sub/c.py"])
+            with patch.object(sys, "stdin", io.StringIO()):  # the worker processes close stdin, which FakeIn does not support
+                self.assertEqual(sorted(found(workers=2, batch_size=1)), sorted(found()))  # the batches are yielded as they complete
+            self.assertEqual(next(cct.search_files(os.path.join(tmpd, "a.py"), "^todo"))["offset"], 23)
+
+    def test_search_files_symlink_loop(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            os.makedirs(os.path.join(tmpd, "a"))
+            with open(os.path.join(tmpd, "a", "file"), "w") as f:
+                f.write("TODO\n")
+            os.symlink("..", os.path.join(tmpd, "a", "loop"))
+            os.symlink("..", os.path.join(tmpd, "a", "loop2"))
+            found = [os.path.relpath(m["path"], tmpd) for m in cct.search_files(tmpd, "TODO", workers=1)]
+            self.assertEqual(found, [os.path.join("a", "file")])
+
     def test_ls_tree(self):
         root = "tests"
         cct.ls_tree(root)
         self.assertIn("test_consolecmdtools.py", self.fakeout.readline())
 
+    def test_ls_tree_as_str(self):
+        root = "tests"
+        result = cct.ls_tree(root, as_str=True)
+        self.assertIn("test_consolecmdtools.py", result)
+        self.assertIsNone(self.fakeout.readline())
+
+    def test_ls_tree_max_depth(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            os.makedirs(os.path.join(tmpd, "sub", "deep"))
+            result = cct.ls_tree(tmpd, max_depth=1, as_str=True)
+            self.assertIn("sub", result)
+            self.assertNotIn("deep", result)
+
+    def test_ls_tree_max_children(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            for i in range(5):
+                open(os.path.join(tmpd, f"file{i}"), "w").close()
+            result = cct.ls_tree(tmpd, max_children=2, ascii=True, as_str=True)
+            self.assertEqual(result.count("file"), 2)
+            self.assertIn("... 3 more", result)
+            for name in ("a.txt", "b.txt", "x.py", "y.txt", "z.py", "w.py"):
+                open(os.path.join(tmpd, name), "w").close()
+            result = cct.ls_tree(tmpd, to_visible=lambda path: path.suffix == ".py", max_children=2, ascii=True, as_str=True)
+            self.assertEqual(result.count(".py"), 2)
+            self.assertIn("... 1 more", result)
+
+    def test_iter_tree_workers(self):
+        root = "tests"
+        expect = list(cct.iter_tree(root, add_suffix=lambda path: path.name.upper()))
+        result = list(cct.iter_tree(root, add_suffix=lambda path: path.name.upper(), workers=4))
+        self.assertEqual(result, expect)
+
+    def test_human_size(self):
+        self.assertEqual(cct.human_size(42), "42 B")
+        self.assertEqual(cct.human_size(1536), "1.5 KB")
+
+    def test_tree_stats(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            os.makedirs(os.path.join(tmpd, "sub"))
+            for relpath, size in (("a.txt", 10), ("b.log", 20), (os.path.join("sub", "c.txt"), 30)):
+                with open(os.path.join(tmpd, relpath), "wb") as f:
+                    f.write(b"x" * size)
+            stats = cct.tree_stats(tmpd, top=2)
+            self.assertEqual(stats["size"], 60)
+            self.assertEqual(stats["files"], 3)
+            self.assertEqual(stats["dirs"], 1)
+            self.assertEqual(stats["exts"]["txt"], {"files": 2, "size": 40})
+            self.assertEqual([size for size, path in stats["largest"]], [30, 20])
+            self.assertEqual(stats["dir_sizes"][os.path.join(os.path.abspath(tmpd), "sub")], 30)
+            tree = cct.ls_tree(tmpd, add_suffix=cct.stats_suffix(stats), as_str=True)
+            self.assertIn("sub/ (30 B)".replace("/", os.sep), tree)
+
+    @unittest.skipIf(platform.system() == "Windows", "symlinks need privileges on Windows")
+    def test_tree_stats_symlink_loop(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            os.makedirs(os.path.join(tmpd, "a"))
+            with open(os.path.join(tmpd, "a", "file"), "wb") as f:
+                f.write(b"x")
+            os.symlink("..", os.path.join(tmpd, "a", "loop"))
+            stats = cct.tree_stats(tmpd, follow_symlinks=True)
+            self.assertEqual((stats["files"], stats["dirs"], stats["size"]), (1, 1, 1))
+
+    def _watch_changes(self, backend):
+        with tempfile.TemporaryDirectory() as tmpd:
+            batches = []
+
+            def make_changes():
+                time.sleep(0.3)
+                os.makedirs(os.path.join(tmpd, "sub"))
+                with open(os.path.join(tmpd, "sub", "file"), "w") as f:
+                    f.write("created")
+                with open(os.path.join(tmpd, "sub", "file"), "a") as f:
+                    f.write(" then modified")
+
+            thread = threading.Thread(target=make_changes)
+            thread.start()
+            cct.watch(tmpd, lambda changes: batches.append(changes) or False, backend=backend, poll_interval=0.2, timeout=5)
+            thread.join()
+            return batches, os.path.join(tmpd, "sub", "file")
+
+    @unittest.skipUnless(platform.system() == "Linux", 'requires Linux')
+    def test_watch_inotify(self):
+        batches, filepath = self._watch_changes("inotify")
+        self.assertEqual(batches, [[("created", filepath)]])
+
+    @unittest.skipUnless(platform.system() == "Linux", 'requires Linux')
+    def test_watch_inotify_move_out(self):
+        with tempfile.TemporaryDirectory() as tmpd, tempfile.TemporaryDirectory() as outside:
+            root = os.path.join(tmpd, "root")
+            os.makedirs(os.path.join(root, "sub", "deep"))
+            for relpath in ("sub/f", "sub/deep/g"):
+                with open(os.path.join(root, relpath), "w") as f:
+                    f.write("x")
+            batches = []
+
+            def make_changes():
+                time.sleep(0.3)
+                os.rename(os.path.join(root, "sub"), os.path.join(outside, "sub"))
+                time.sleep(0.3)
+                with open(os.path.join(outside, "sub", "new"), "w") as f:  # not in the tree anymore
+                    f.write("x")
+                with open(os.path.join(root, "h"), "w") as f:
+                    f.write("x")
+
+            thread = threading.Thread(target=make_changes)
+            thread.start()
+            cct.watch(root, lambda changes: batches.append(changes) or len(batches) < 2, backend="inotify", timeout=5)
+            thread.join()
+            self.assertEqual(batches, [
+                [("deleted", os.path.join(root, "sub", "deep", "g")), ("deleted", os.path.join(root, "sub", "f"))],
+                [("created", os.path.join(root, "h"))],
+            ])
+
+    def test_watch_polling(self):
+        batches, filepath = self._watch_changes("polling")
+        self.assertEqual(batches, [[("created", filepath)]])
+
+    def test_watch_stop(self):
+        with tempfile.TemporaryDirectory() as tmpd:
+            stop = threading.Event()
+            stop.set()
+            cct.watch(tmpd, lambda changes: None, stop=stop)  # returns immediately
+
     def test_resolve_value_any(self):
         self.assertEqual(cct.resolve_value("test"), "test")
 